@@ -1,36 +1,72 @@
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
 from typing import Optional
 
-# Load environment variables from .env file
-load_dotenv()
 
+@lru_cache(maxsize=None)
+def _load_env():
+    """Load environment variables from .env file (only once per process)"""
+    load_dotenv()
 
-class Config(BaseModel):
+
+_load_env()
+
+# Read environment variables once at import time
+_NEO4J_URI = os.getenv("NEO4J_URI", "neo4j://localhost:7687")
+_NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
+_NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+_NEO4J_POOL_SIZE = int(os.getenv("NEO4J_POOL_SIZE", "50"))
+_NEO4J_ACQ_TIMEOUT = float(os.getenv("NEO4J_ACQ_TIMEOUT", "60.0"))
+_NEO4J_CONNECTION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_TIMEOUT", "30.0"))
+_NEO4J_MAX_RETRY_TIME = float(os.getenv("NEO4J_MAX_RETRY_TIME", "30.0"))
+_NEO4J_PARALLEL_RUNTIME = os.getenv("NEO4J_PARALLEL_RUNTIME", "false").lower() == "true"
+_GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+_GEMINI_CACHE_PATH = os.getenv("GEMINI_CACHE_PATH", "data/cache/gemini.sqlite")
+_CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "500"))
+_CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "100"))
+_EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "384"))
+_EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "data/cache/embeddings.sqlite")
+_MAX_TOKENS = int(os.getenv("MAX_TOKENS", "2000"))
+_TEMPERATURE = float(os.getenv("TEMPERATURE", "0.0"))
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
     """Application configuration"""
 
     # Neo4j Configuration
-    NEO4J_URI: str = Field(default_factory=lambda: os.getenv("NEO4J_URI", "neo4j://localhost:7687"))
-    NEO4J_USERNAME: str = Field(default_factory=lambda: os.getenv("NEO4J_USERNAME", "neo4j"))
-    NEO4J_PASSWORD: Optional[str] = Field(default_factory=lambda: os.getenv("NEO4J_PASSWORD"))
+    NEO4J_URI: str = _NEO4J_URI
+    NEO4J_USERNAME: str = _NEO4J_USERNAME
+    NEO4J_PASSWORD: Optional[str] = _NEO4J_PASSWORD
+    NEO4J_POOL_SIZE: int = _NEO4J_POOL_SIZE
+    NEO4J_ACQ_TIMEOUT: float = _NEO4J_ACQ_TIMEOUT
+    NEO4J_CONNECTION_TIMEOUT: float = _NEO4J_CONNECTION_TIMEOUT
+    NEO4J_MAX_RETRY_TIME: float = _NEO4J_MAX_RETRY_TIME
+    NEO4J_PARALLEL_RUNTIME: bool = _NEO4J_PARALLEL_RUNTIME  # Enterprise 5.13+ only
 
     # Google Gemini API
-    GEMINI_API_KEY: Optional[str] = Field(default_factory=lambda: os.getenv("GEMINI_API_KEY"))
+    GEMINI_API_KEY: Optional[str] = _GEMINI_API_KEY
+    GEMINI_CACHE_PATH: str = _GEMINI_CACHE_PATH  # empty disables the cache
 
     # Application Settings
-    CHUNK_SIZE: int = Field(default_factory=lambda: int(os.getenv("CHUNK_SIZE", "500")))
-    CHUNK_OVERLAP: int = Field(default_factory=lambda: int(os.getenv("CHUNK_OVERLAP", "100")))
-    EMBEDDING_DIMENSION: int = Field(default_factory=lambda: int(os.getenv("EMBEDDING_DIMENSION", "384")))
-    MAX_TOKENS: int = Field(default_factory=lambda: int(os.getenv("MAX_TOKENS", "2000")))
-    TEMPERATURE: float = Field(default_factory=lambda: float(os.getenv("TEMPERATURE", "0.0")))
+    CHUNK_SIZE: int = _CHUNK_SIZE
+    CHUNK_OVERLAP: int = _CHUNK_OVERLAP
+    EMBEDDING_DIMENSION: int = _EMBEDDING_DIMENSION
+    EMBED_CACHE_PATH: str = _EMBED_CACHE_PATH  # empty disables the cache
+    MAX_TOKENS: int = _MAX_TOKENS
+    TEMPERATURE: float = _TEMPERATURE
+
 
-    class Config:
-        arbitrary_types_allowed = True
+@lru_cache(maxsize=None)
+def get_config() -> Config:
+    """Get the shared configuration instance"""
+    return Config()
 
 
 # Create global config instance
-config = Config()
+config = get_config()
 
 # Validate critical settings
 if not config.NEO4J_PASSWORD:
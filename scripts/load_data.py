@@ -1,18 +1,71 @@
 import sys
+from pathlib import Path
 
-sys.path.append('..')
+# Add the project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
 
 from src.ingestion.pdf_processor import PDFProcessor
 from src.ingestion.text_splitter import TextChunker
 from src.ingestion.embeddings_generator import EmbeddingsGenerator
-from src.graph.neo4j_client import Neo4jClient
+from src.graph.neo4j_client import get_client
 from src.graph.graph_builder import GraphBuilder
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from tqdm import tqdm
 import json
+import os
+
+
+def _extract_pyq(pdf_file: Path) -> list:
+    """Extract questions from one PYQ PDF (runs in a worker process)"""
+    # Extract year and set from filename
+    # Assuming format: gate_YYYY_setN.pdf
+    filename = pdf_file.stem
+    parts = filename.split('_')
+    year = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 2023
+    paper_set = parts[2] if len(parts) > 2 else 'set1'
+
+    # Extract questions
+    questions = PDFProcessor().extract_questions_from_pyq(
+        str(pdf_file), year, paper_set
+    )
+
+    # TODO: You need to map questions to subjects/topics
+    # This is a simplified example
+    for q in questions:
+        q['subject'] = 'Operating Systems'  # Detect from question
+        q['topic'] = 'Process Management'  # Detect from question
+
+    return questions
+
+
+def _extract_and_chunk(pdf_file: Path, tokenizer=None, chunk_size: int = None) -> list:
+    """Extract and chunk one textbook PDF (runs in a worker process)"""
+    # Chunk the document page by page as text is extracted
+    metadata = {'file_name': pdf_file.name, 'source_type': 'textbook'}
+    try:
+        chunks = TextChunker(chunk_size, tokenizer=tokenizer).chunk_pages(
+            PDFProcessor().iter_pages(str(pdf_file)), metadata
+        )
+    except Exception as e:
+        print(f"Error extracting text from {pdf_file}: {e}")
+        return []
+
+    # TODO: Map chunks to subjects/topics based on filename or content
+    subject = 'Operating Systems'  # Detect from filename
+    topic = 'Process Management'  # Detect from content
 
+    # Add metadata
+    for chunk in chunks:
+        chunk['subject'] = subject
+        chunk['topic'] = topic
+        chunk['source_file'] = pdf_file.name
 
-def load_syllabus():
+    return chunks
+
+
+def load_syllabus(builder: GraphBuilder):
     """Load syllabus into graph"""
     print("\n" + "=" * 60)
     print("LOADING SYLLABUS")
@@ -54,9 +107,6 @@ def load_syllabus():
         # Add more subjects and topics as needed
     }
 
-    client = Neo4jClient()
-    builder = GraphBuilder(client)
-
     builder.load_syllabus(syllabus_data)
 
     stats = builder.get_graph_statistics()
@@ -64,100 +114,88 @@ def load_syllabus():
     print(f"   Subjects: {stats['subjects']}")
     print(f"   Topics: {stats['topics']}")
 
-    client.close()
 
+def _iter_pyq_batches(pdf_files: list, batch_size: int = 500):
+    """Yield batches of parsed questions as PYQ PDFs finish processing"""
+    batch = []
+
+    # Parse PDFs in parallel, one file per worker
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for questions in tqdm(executor.map(_extract_pyq, pdf_files),
+                              total=len(pdf_files), desc="Processing PYQs",
+                              mininterval=0.5):
+            batch.extend(questions)
+            while len(batch) >= batch_size:
+                yield batch[:batch_size]
+                batch = batch[batch_size:]
 
-def load_pyqs():
+    if batch:
+        yield batch
+
+
+def _iter_chunk_batches(pdf_files: list, embedder: EmbeddingsGenerator,
+                        batch_size: int = 500):
+    """Yield batches of embedded chunks as textbook PDFs finish processing"""
+    batch = []
+
+    # Size chunks in the embedding model's tokens so none is truncated;
+    # the splitter counts text tokens only, so leave room for [CLS]/[SEP]
+    tokenizer = embedder.model.tokenizer
+    chunk_size = embedder.model.max_seq_length - 2
+    extract = partial(_extract_and_chunk, tokenizer=tokenizer, chunk_size=chunk_size)
+
+    # Extract and chunk PDFs in parallel, one file per worker. Embedding
+    # stays in the main process so the model is loaded only once.
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for chunks in tqdm(executor.map(extract, pdf_files),
+                           total=len(pdf_files), desc="Processing textbooks",
+                           mininterval=0.5):
+            batch.extend(chunks)
+            while len(batch) >= batch_size:
+                yield embedder.embed_chunks(batch[:batch_size], show_progress=False)
+                batch = batch[batch_size:]
+
+    if batch:
+        yield embedder.embed_chunks(batch, show_progress=False)
+
+
+def load_pyqs(builder: GraphBuilder):
     """Load previous years questions"""
     print("\n" + "=" * 60)
     print("LOADING PREVIOUS YEARS QUESTIONS")
     print("=" * 60)
 
-    processor = PDFProcessor()
-    client = Neo4jClient()
-    builder = GraphBuilder(client)
-
     pyq_dir = Path("data/raw/pyqs")
     pdf_files = list(pyq_dir.glob("*.pdf"))
 
     print(f"Found {len(pdf_files)} PYQ PDFs")
 
-    all_questions = []
-    for pdf_file in tqdm(pdf_files, desc="Processing PYQs"):
-        # Extract year and set from filename
-        # Assuming format: gate_YYYY_setN.pdf
-        filename = pdf_file.stem
-        parts = filename.split('_')
-        year = int(parts) if len(parts) > 1 else 2023
-        paper_set = parts if len(parts) > 2 else 'set1'
-
-        # Extract questions
-        questions = processor.extract_questions_from_pyq(
-            str(pdf_file), year, paper_set
-        )
-
-        # TODO: You need to map questions to subjects/topics
-        # This is a simplified example
-        for q in questions:
-            q['subject'] = 'Operating Systems'  # Detect from question
-            q['topic'] = 'Process Management'  # Detect from question
-
-        all_questions.extend(questions)
-
-    # Load into graph
-    builder.load_pyqs(all_questions)
+    # Stream batches into the graph as they are parsed
+    loaded = builder.load_pyqs_stream(_iter_pyq_batches(pdf_files))
 
-    print(f"\n✅ Loaded {len(all_questions)} questions")
+    # Also fills in counts for topics loaded before they were maintained
+    builder.refresh_question_counts()
 
-    client.close()
+    print(f"\n✅ Loaded {loaded} questions")
 
 
-def load_textbooks():
+def load_textbooks(builder: GraphBuilder):
     """Load and chunk textbooks"""
     print("\n" + "=" * 60)
     print("LOADING TEXTBOOKS")
     print("=" * 60)
 
-    processor = PDFProcessor()
-    chunker = TextChunker()
-    embedder = EmbeddingsGenerator()
-    client = Neo4jClient()
-    builder = GraphBuilder(client)
-
     textbook_dir = Path("data/raw/textbooks")
     pdf_files = list(textbook_dir.glob("*.pdf"))
 
     print(f"Found {len(pdf_files)} textbook PDFs")
 
-    all_chunks = []
-    for pdf_file in tqdm(pdf_files, desc="Processing textbooks"):
-        # Extract text
-        doc_data = processor.extract_text_from_pdf(str(pdf_file))
-
-        # Chunk the document
-        chunks = chunker.chunk_document(doc_data)
-
-        # TODO: Map chunks to subjects/topics based on filename or content
-        subject = 'Operating Systems'  # Detect from filename
-        topic = 'Process Management'  # Detect from content
+    # Stream embedded batches into the graph as they are produced
+    loaded = builder.load_textbook_chunks_stream(
+        _iter_chunk_batches(pdf_files, builder.embedder)
+    )
 
-        # Add metadata
-        for chunk in chunks:
-            chunk['subject'] = subject
-            chunk['topic'] = topic
-            chunk['source_file'] = pdf_file.name
-
-        # Generate embeddings in batches
-        chunks_with_embeddings = embedder.embed_chunks(chunks)
-
-        all_chunks.extend(chunks_with_embeddings)
-
-    # Load into graph
-    builder.load_textbook_chunks(all_chunks)
-
-    print(f"\n✅ Loaded {len(all_chunks)} textbook chunks")
-
-    client.close()
+    print(f"\n✅ Loaded {loaded} textbook chunks")
 
 
 def main():
@@ -166,14 +204,26 @@ def main():
     print("GATE CS 2026 Prep System - Data Loading")
     print("=" * 60)
 
-    # Step 1: Load syllabus
-    load_syllabus()
+    # Share one driver and one embedding model across all phases
+    client = get_client()
+    embedder = EmbeddingsGenerator()
+    builder = GraphBuilder(client, embedder=embedder)
+
+    try:
+        # Create indexes before loading so they are maintained during writes
+        client.bootstrap_schema(dimension=embedder.get_dimension())
+
+        # Step 1: Load syllabus
+        load_syllabus(builder)
 
-    # Step 2: Load PYQs
-    load_pyqs()
+        # Step 2: Load PYQs
+        load_pyqs(builder)
 
-    # Step 3: Load textbooks
-    load_textbooks()
+        # Step 3: Load textbooks
+        load_textbooks(builder)
+    finally:
+        embedder.close()
+        client.close()
 
     print("\n" + "=" * 60)
     print("✅ DATA LOADING COMPLETE!")
@@ -15,6 +15,15 @@ except ModuleNotFoundError as e:
 
 from neo4j import GraphDatabase
 
+STATS_QUERY = """
+CALL { MATCH (n:Subject) RETURN count(n) AS Subjects }
+CALL { MATCH (n:Topic) RETURN count(n) AS Topics }
+CALL { MATCH (n:Question) RETURN count(n) AS Questions }
+CALL { MATCH (n:Chunk) RETURN count(n) AS Chunks }
+CALL { MATCH (n:Concept) RETURN count(n) AS Concepts }
+RETURN Subjects, Topics, Questions, Chunks, Concepts
+"""
+
 
 class DatabaseSetup:
     """Setup Neo4j database with indexes and constraints"""
@@ -44,25 +53,40 @@ class DatabaseSetup:
             print(f"❌ Connection verification failed: {e}")
             return False
 
-    def create_constraints(self):
+    def create_schema(self):
+        """Create constraints, indexes and the vector index over one session"""
+        with self.driver.session() as session:
+            self.create_constraints(session)
+            self.create_indexes(session)
+            self.create_vector_index(session)
+
+    def create_constraints(self, session=None):
         """Create uniqueness constraints"""
+        if session is None:
+            with self.driver.session() as session:
+                return self.create_constraints(session)
+
         print("\n📝 Creating constraints...")
 
         constraints = [
             "CREATE CONSTRAINT subject_name_unique IF NOT EXISTS FOR (s:Subject) REQUIRE s.name IS UNIQUE",
             "CREATE CONSTRAINT topic_unique IF NOT EXISTS FOR (t:Topic) REQUIRE (t.name, t.subject) IS UNIQUE",
+            "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE",
         ]
 
-        with self.driver.session() as session:
-            for constraint in constraints:
-                try:
-                    session.run(constraint)
-                    print(f"  ✓ {constraint.split('FOR')[1].split('REQUIRE')[0].strip()}")
-                except Exception as e:
-                    print(f"  ⚠ {e}")
-
-    def create_indexes(self):
+        for constraint in constraints:
+            try:
+                session.run(constraint).consume()
+                print(f"  ✓ {constraint.split('FOR')[1].split('REQUIRE')[0].strip()}")
+            except Exception as e:
+                print(f"  ⚠ {e}")
+
+    def create_indexes(self, session=None):
         """Create indexes for performance"""
+        if session is None:
+            with self.driver.session() as session:
+                return self.create_indexes(session)
+
         print("\n📝 Creating indexes...")
 
         indexes = [
@@ -71,20 +95,25 @@ class DatabaseSetup:
             "CREATE INDEX topic_subject IF NOT EXISTS FOR (t:Topic) ON (t.subject)",
             "CREATE INDEX question_year IF NOT EXISTS FOR (q:Question) ON (q.year)",
             "CREATE INDEX question_difficulty IF NOT EXISTS FOR (q:Question) ON (q.difficulty)",
+            "CREATE INDEX question_year_diff IF NOT EXISTS FOR (q:Question) ON (q.year, q.difficulty)",
             "CREATE INDEX chunk_source IF NOT EXISTS FOR (c:Chunk) ON (c.source_type)",
+            "CREATE TEXT INDEX question_text IF NOT EXISTS FOR (q:Question) ON (q.text)",
         ]
 
-        with self.driver.session() as session:
-            for index in indexes:
-                try:
-                    session.run(index)
-                    index_name = index.split('FOR')[1].split('ON')[0].strip()
-                    print(f"  ✓ {index_name}")
-                except Exception as e:
-                    print(f"  ⚠ {e}")
-
-    def create_vector_index(self):
+        for index in indexes:
+            try:
+                session.run(index).consume()
+                index_name = index.split('FOR')[1].split('ON')[0].strip()
+                print(f"  ✓ {index_name}")
+            except Exception as e:
+                print(f"  ⚠ {e}")
+
+    def create_vector_index(self, session=None):
         """Create vector index for embeddings"""
+        if session is None:
+            with self.driver.session() as session:
+                return self.create_vector_index(session)
+
         print("\n📝 Creating vector index...")
 
         query = """
@@ -100,9 +129,8 @@ class DatabaseSetup:
         """
 
         try:
-            with self.driver.session() as session:
-                session.run(query)
-                print("  ✓ Vector index 'chunk_embeddings' created")
+            session.run(query).consume()
+            print("  ✓ Vector index 'chunk_embeddings' created")
         except Exception as e:
             print(f"  ⚠ Vector index creation: {e}")
 
@@ -110,22 +138,13 @@ class DatabaseSetup:
         """Get current database statistics"""
         print("\n📊 Database Statistics:")
 
-        queries = {
-            'Subjects': "MATCH (s:Subject) RETURN count(s) as count",
-            'Topics': "MATCH (t:Topic) RETURN count(t) as count",
-            'Questions': "MATCH (q:Question) RETURN count(q) as count",
-            'Chunks': "MATCH (c:Chunk) RETURN count(c) as count",
-            'Concepts': "MATCH (c:Concept) RETURN count(c) as count",
-        }
-
         with self.driver.session() as session:
-            for name, query in queries.items():
-                try:
-                    result = session.run(query)
-                    count = result.single()['count']
+            try:
+                counts = session.run(STATS_QUERY).single()
+                for name, count in counts.items():
                     print(f"  {name}: {count}")
-                except Exception as e:
-                    print(f"  {name}: Error - {e}")
+            except Exception as e:
+                print(f"  Error - {e}")
 
     def close(self):
         """Close database connection"""
@@ -166,14 +185,8 @@ def main():
         setup.close()
         sys.exit(1)
 
-    # Create constraints
-    setup.create_constraints()
-
-    # Create indexes
-    setup.create_indexes()
-
-    # Create vector index
-    setup.create_vector_index()
+    # Create constraints, indexes and vector index
+    setup.create_schema()
 
     # Show statistics
     setup.get_database_stats()
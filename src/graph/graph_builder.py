@@ -2,40 +2,299 @@
 Graph builder for constructing knowledge graph in Neo4j
 """
 
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List, Dict, Optional, Tuple
 from tqdm import tqdm
-import sys
-
-sys.path.append('../..')
 
 from src.graph.neo4j_client import Neo4jClient
 from src.ingestion.embeddings_generator import EmbeddingsGenerator
 
+# ============= Cypher Queries =============
+
+_CREATE_SUBJECT_CYPHER = """
+    MERGE (s:Subject {name: $name})
+    SET s.description = $description,
+        s.updated_at = datetime()
+    RETURN s
+"""
+
+_CREATE_TOPIC_CYPHER = """
+    MATCH (s:Subject {name: $subject_name})
+    MERGE (t:Topic {name: $topic_name, subject: $subject_name})
+    SET t.description = $description,
+        t.difficulty_level = $difficulty,
+        t.updated_at = datetime()
+    MERGE (s)-[:HAS_TOPIC]->(t)
+    RETURN t
+"""
+
+_LOAD_SYLLABUS_CYPHER = """
+    UNWIND $rows AS s
+    MERGE (sub:Subject {name: s.name})
+    ON CREATE SET sub.created_at = $now
+    SET sub.description = s.description,
+        sub.updated_at = $now
+    WITH sub, s
+    UNWIND s.topics AS t
+    MERGE (top:Topic {name: t.name, subject: s.name})
+    ON CREATE SET top.created_at = $now
+    SET top.description = t.description,
+        top.difficulty_level = t.difficulty,
+        top.updated_at = $now
+    MERGE (sub)-[:HAS_TOPIC]->(top)
+"""
+
+_BULK_CREATE_QUESTIONS_CYPHER = """
+    UNWIND $rows AS r
+    OPTIONAL MATCH (t:Topic {name: r.topic, subject: r.subject})
+    CALL {
+        WITH r, t
+        WITH r, t WHERE t IS NOT NULL
+        CREATE (q:Question {
+            text: r.text,
+            year: r.year,
+            paper_set: r.paper_set,
+            options: r.options,
+            answer: r.answer,
+            difficulty: r.difficulty,
+            marks: r.marks,
+            created_at: $now
+        })
+        MERGE (t)-[:HAS_QUESTION]->(q)
+        // Stored count, so topic listings never aggregate over questions
+        SET t.question_count = coalesce(t.question_count, 0) + 1
+        WITH q, r
+        CALL db.create.setNodeVectorProperty(q, 'embedding', r.embedding)
+        RETURN count(q) AS n
+    }
+    RETURN sum(n) AS created,
+           collect(DISTINCT CASE WHEN t IS NULL THEN [r.subject, r.topic] END) AS missing
+"""
+
+_BULK_CREATE_CHUNKS_CYPHER = """
+    UNWIND $rows AS r
+    OPTIONAL MATCH (t:Topic {name: r.topic, subject: r.subject})
+    CALL {
+        WITH r, t
+        WITH r, t WHERE t IS NOT NULL
+        CREATE (c:Chunk {
+            text: r.text,
+            source_file: r.source_file,
+            source_type: 'textbook',
+            page_number: r.page_number,
+            chunk_index: r.chunk_index,
+            created_at: $now
+        })
+        MERGE (t)-[:EXPLAINED_BY]->(c)
+        WITH c, r
+        CALL db.create.setNodeVectorProperty(c, 'embedding', r.embedding)
+        RETURN count(c) AS n
+    }
+    RETURN sum(n) AS created,
+           collect(DISTINCT CASE WHEN t IS NULL THEN [r.subject, r.topic] END) AS missing
+"""
+
+# Server-side batching for very large chunk loads (requires APOC). Rows
+# whose topic does not exist are skipped by the inner MATCH.
+_APOC_LOAD_CHUNKS_CYPHER = """
+    CALL apoc.periodic.iterate(
+        'UNWIND $rows AS r RETURN r',
+        'MATCH (t:Topic {name: r.topic, subject: r.subject})
+         CREATE (c:Chunk {
+             text: r.text,
+             source_file: r.source_file,
+             source_type: "textbook",
+             page_number: r.page_number,
+             chunk_index: r.chunk_index,
+             created_at: $now
+         })
+         MERGE (t)-[:EXPLAINED_BY]->(c)
+         WITH c, r
+         CALL db.create.setNodeVectorProperty(c, "embedding", r.embedding)',
+        {batchSize: $batch_size, parallel: $parallel, retries: $retries,
+         params: {rows: $rows, now: $now}}
+    )
+    YIELD batches, failedBatches, errorMessages, updateStatistics
+    RETURN batches, failedBatches, errorMessages,
+           updateStatistics.nodesCreated AS created
+"""
+
+_GRAPH_STATISTICS_CYPHER = """
+    CALL { MATCH (n:Subject) RETURN count(n) AS subjects }
+    CALL { MATCH (n:Topic) RETURN count(n) AS topics }
+    CALL { MATCH (n:Question) RETURN count(n) AS questions }
+    CALL { MATCH (n:Chunk) RETURN count(n) AS chunks }
+    CALL { MATCH (n:Concept) RETURN count(n) AS concepts }
+    RETURN subjects, topics, questions, chunks, concepts
+"""
+
+# Recounts Topic.question_count, for graphs loaded before it was maintained
+_REFRESH_QUESTION_COUNTS_CYPHER = """
+    MATCH (t:Topic)
+    SET t.question_count = COUNT { (t)-[:HAS_QUESTION]->(:Question) }
+    RETURN count(t) AS topics
+"""
+
+_CREATE_CONCEPT_CYPHER = """
+    MATCH (t:Topic {name: $topic, subject: $subject})
+    MERGE (c:Concept {name: $name, topic: $topic, subject: $subject})
+    SET c.explanation = $explanation,
+        c.updated_at = datetime()
+    MERGE (t)-[:HAS_CONCEPT]->(c)
+    RETURN c
+"""
+
 
 class GraphBuilder:
     """Build knowledge graph from processed data"""
 
-    def __init__(self, neo4j_client: Neo4jClient):
+    def __init__(self, neo4j_client: Neo4jClient,
+                 embedder: Optional[EmbeddingsGenerator] = None):
         """
         Initialize graph builder
 
         Args:
             neo4j_client: Neo4j client instance
+            embedder: Shared embeddings generator (loaded on first use
+                if not given)
         """
         self.client = neo4j_client
-        self.embedder = EmbeddingsGenerator()
+        self._embedder = embedder
+
+    @property
+    def embedder(self) -> EmbeddingsGenerator:
+        """Embeddings generator, loading the model only when first needed"""
+        if self._embedder is None:
+            self._embedder = EmbeddingsGenerator()
+        return self._embedder
+
+    @contextmanager
+    def session(self):
+        """
+        Open a driver session to share across related writes
+
+        Bulk loaders accept it through their session argument. Single-row
+        helpers such as create_subject and create_concept go through
+        Neo4jClient and still open their own session per call.
+
+        Yields:
+            Neo4j session
+        """
+        with self.client.driver.session() as session:
+            yield session
+
+    def _bulk_tx(self, query: str, rows: List[Dict], batch_size: int = 500,
+                 desc: str = "Writing", show_progress: bool = True,
+                 session=None) -> List[Dict]:
+        """
+        Write rows in batches, one explicit transaction per batch
+
+        All batches share a single session, and each batch is committed
+        once, so N rows cost N / batch_size commits instead of N. A single
+        client-side timestamp is passed to every batch as $now.
+
+        Args:
+            query: Cypher query reading the batch from $rows
+            rows: Parameter rows
+            batch_size: Number of rows per transaction
+            desc: Progress bar description
+            show_progress: Show progress bar
+            session: Session to write through (opened here if not given)
+
+        Returns:
+            Records returned by all batches
+        """
+        if session is None:
+            with self.session() as session:
+                return self._bulk_tx(query, rows, batch_size, desc,
+                                     show_progress, session)
+
+        records = []
+        now = datetime.now(timezone.utc)
+
+        for i in tqdm(range(0, len(rows), batch_size), desc=desc,
+                      mininterval=0.5, disable=not show_progress):
+            with session.begin_transaction() as tx:
+                try:
+                    result = tx.run(query, rows=rows[i:i + batch_size], now=now)
+                    records.extend(record.data() for record in result)
+                    tx.commit()
+                except Exception as e:
+                    print(f"Bulk write error: {e}")
+                    raise
+
+        return records
+
+    def _write_behind(self, batches: Iterable[List[Dict]], prepare: Callable,
+                      write: Callable, session) -> Tuple[int, int, set]:
+        """
+        Prepare (embed) each batch while the previous one is being written
+
+        Writes run one at a time on a single background thread, so the
+        session is never used concurrently and at most one prepared batch
+        waits in memory.
+
+        Args:
+            batches: Iterable yielding lists of input dictionaries
+            prepare: Row builder, e.g. _prepare_chunk_rows
+            write: Bulk writer, e.g. _bulk_create_chunks
+            session: Session used for every write
+
+        Returns:
+            Tuple of (created, failed, missing (subject, topic) pairs)
+        """
+        created = 0
+        failed = 0
+        missing = set()
+        pending = None
+
+        def collect():
+            nonlocal created, failed
+            future, size = pending
+            count = future.result()
+            created += count
+            failed += size - count
+
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            for batch in batches:
+                rows = prepare(batch, show_progress=False)
+
+                if pending is not None:
+                    collect()
+
+                pending = (writer.submit(write, rows, len(rows) or 1,
+                                         show_progress=False, missing=missing,
+                                         session=session), len(batch))
+
+            if pending is not None:
+                collect()
+
+        return created, failed, missing
+
+    @staticmethod
+    def _report_missing_topics(missing: set, limit: int = 10):
+        """
+        Print one summary for rows skipped because their topic was not found
+
+        Args:
+            missing: Set of (subject, topic) pairs
+            limit: Maximum number of pairs to list
+        """
+        if not missing:
+            return
+
+        pairs = sorted(missing)
+        listed = ", ".join(f"{topic} in {subject}" for subject, topic in pairs[:limit])
+        more = f" (+{len(pairs) - limit} more)" if len(pairs) > limit else ""
+        print(f"⚠️  {len(pairs)} topics not found: {listed}{more}")
 
     # ============= Subject and Topic Management =============
 
     def create_subject(self, name: str, description: str = "") -> Dict:
         """Create a Subject node"""
-        query = """
-        MERGE (s:Subject {name: $name})
-        SET s.description = $description,
-            s.updated_at = datetime()
-        RETURN s
-        """
-        result = self.client.run_query(query, {
+        result = self.client.run_query(_CREATE_SUBJECT_CYPHER, {
             'name': name,
             'description': description
         })
@@ -52,16 +311,7 @@ class GraphBuilder:
             description: Topic description
             difficulty: Difficulty level (1-5)
         """
-        query = """
-        MATCH (s:Subject {name: $subject_name})
-        MERGE (t:Topic {name: $topic_name, subject: $subject_name})
-        SET t.description = $description,
-            t.difficulty_level = $difficulty,
-            t.updated_at = datetime()
-        MERGE (s)-[:HAS_TOPIC]->(t)
-        RETURN t
-        """
-        result = self.client.run_query(query, {
+        result = self.client.run_query(_CREATE_TOPIC_CYPHER, {
             'subject_name': subject_name,
             'topic_name': topic_name,
             'description': description,
@@ -69,7 +319,7 @@ class GraphBuilder:
         })
         return result[0] if result else None
 
-    def load_syllabus(self, syllabus_data: Dict):
+    def load_syllabus(self, syllabus_data: Dict, session=None):
         """
         Load complete syllabus into graph
 
@@ -84,31 +334,37 @@ class GraphBuilder:
                         ]
                     }
                 }
+            session: Session to write through (opened if not given)
         """
         print("\n📚 Loading syllabus into graph...")
 
-        for subject_name, subject_info in tqdm(syllabus_data.items(), desc="Loading subjects"):
-            # Create subject
-            self.create_subject(
-                name=subject_name,
-                description=subject_info.get('description', '')
-            )
+        # Ship the whole syllabus as one parameter so subjects and topics
+        # are merged in a single round-trip instead of one query per node
+        subjects = [
+            {
+                'name': subject_name,
+                'description': subject_info.get('description', ''),
+                'topics': [
+                    {
+                        'name': topic['name'],
+                        'description': topic.get('description', ''),
+                        'difficulty': topic.get('difficulty', 1)
+                    }
+                    for topic in subject_info.get('topics', [])
+                ]
+            }
+            for subject_name, subject_info in syllabus_data.items()
+        ]
 
-            # Create topics
-            for topic in subject_info.get('topics', []):
-                self.create_topic(
-                    subject_name=subject_name,
-                    topic_name=topic['name'],
-                    description=topic.get('description', ''),
-                    difficulty=topic.get('difficulty', 1)
-                )
+        self._bulk_tx(_LOAD_SYLLABUS_CYPHER, subjects, desc="Loading subjects",
+                      session=session)
 
         stats = self.get_graph_statistics()
         print(f"✅ Syllabus loaded: {stats['subjects']} subjects, {stats['topics']} topics")
 
     # ============= Question Management =============
 
-    def create_question(self, question_data: Dict) -> Dict:
+    def create_question(self, question_data: Dict) -> bool:
         """
         Create a Question node
 
@@ -123,89 +379,144 @@ class GraphBuilder:
                 - answer: Correct answer (optional)
                 - difficulty: Difficulty level (optional)
                 - marks: Question marks (optional)
-        """
-        # First, ensure topic exists
-        topic_query = """
-        MATCH (t:Topic {name: $topic, subject: $subject})
-        RETURN t
-        """
-        topic_result = self.client.run_query(topic_query, {
-            'subject': question_data['subject'],
-            'topic': question_data['topic']
-        })
 
-        if not topic_result:
-            print(f"⚠️  Topic not found: {question_data['topic']} in {question_data['subject']}")
-            return None
+        Returns:
+            True if the question was created
+        """
+        rows = self._prepare_question_rows([question_data])
+        return self._bulk_create_questions(rows, show_progress=False) > 0
 
-        # Generate embedding for question
-        full_text = question_data['question_text']
-        if question_data.get('options'):
-            full_text += "\n" + "\n".join(question_data['options'])
+    def _prepare_question_rows(self, questions: List[Dict],
+                               batch_size: int = 64,
+                               show_progress: bool = True) -> List[Dict]:
+        """
+        Build Cypher parameter rows for questions, embedding them in batches
 
-        embedding = self.embedder.generate_embedding(full_text)
+        Args:
+            questions: List of question dictionaries
+            batch_size: Batch size for the embedding model
+            show_progress: Show the embedding progress bar for large inputs
 
-        # Create question with embedding
-        query = """
-        MATCH (t:Topic {name: $topic, subject: $subject})
-        CREATE (q:Question {
-            text: $text,
-            year: $year,
-            paper_set: $paper_set,
-            options: $options,
-            answer: $answer,
-            difficulty: $difficulty,
-            marks: $marks,
-            embedding: $embedding,
-            created_at: datetime()
-        })
-        MERGE (t)-[:HAS_QUESTION]->(q)
-        RETURN q
-        """
-
-        result = self.client.run_query(query, {
-            'subject': question_data['subject'],
-            'topic': question_data['topic'],
-            'text': question_data['question_text'],
-            'year': question_data.get('year', 0),
-            'paper_set': question_data.get('paper_set', 'unknown'),
-            'options': question_data.get('options', []),
-            'answer': question_data.get('answer', ''),
-            'difficulty': question_data.get('difficulty', 0),
-            'marks': question_data.get('marks', 1),
-            'embedding': embedding
-        })
+        Returns:
+            List of parameter rows with embeddings
+        """
+        texts = []
+        for question_data in questions:
+            full_text = question_data['question_text']
+            if question_data.get('options'):
+                full_text += "\n" + "\n".join(question_data['options'])
+            texts.append(full_text)
+
+        embeddings = self.embedder.generate_embeddings_batch(
+            texts, batch_size=batch_size, show_progress=show_progress and len(texts) > batch_size
+        )
+
+        return [
+            {
+                'subject': question_data['subject'],
+                'topic': question_data['topic'],
+                'text': question_data['question_text'],
+                'year': question_data.get('year', 0),
+                'paper_set': question_data.get('paper_set', 'unknown'),
+                'options': question_data.get('options', []),
+                'answer': question_data.get('answer', ''),
+                'difficulty': question_data.get('difficulty', 0),
+                'marks': question_data.get('marks', 1),
+                'embedding': embedding
+            }
+            for question_data, embedding in zip(questions, embeddings)
+        ]
+
+    def _bulk_create_questions(self, rows: List[Dict], batch_size: int = 500,
+                               show_progress: bool = True,
+                               missing: Optional[set] = None,
+                               session=None) -> int:
+        """
+        Create Question nodes in UNWIND batches
 
-        return result[0] if result else None
+        Rows whose topic does not exist are skipped inside the query and
+        reported afterwards, so no separate topic lookup is needed.
+        Embeddings are stored with db.create.setNodeVectorProperty, which
+        keeps them as a float32 array (half the size of a Cypher float list).
 
-    def load_pyqs(self, pyqs_data: List[Dict]):
+        Args:
+            rows: Parameter rows built by _prepare_question_rows
+            batch_size: Number of rows sent per query
+            show_progress: Show progress bar
+            missing: Set collecting (subject, topic) pairs that were not
+                found; when given, reporting is left to the caller
+            session: Session to write through (opened if not given)
+
+        Returns:
+            Number of questions created
+        """
+        created = 0
+        report = missing is None
+        if report:
+            missing = set()
+        records = self._bulk_tx(_BULK_CREATE_QUESTIONS_CYPHER, rows, batch_size,
+                                desc="Loading questions", show_progress=show_progress,
+                                session=session)
+        for record in records:
+            created += record['created']
+            missing.update(tuple(pair) for pair in record['missing'])
+
+        if report:
+            self._report_missing_topics(missing)
+
+        return created
+
+    def load_pyqs(self, pyqs_data: List[Dict], batch_size: int = 500,
+                  session=None):
         """
         Load Previous Years Questions into graph
 
         Args:
             pyqs_data: List of question dictionaries
+            batch_size: Number of questions written per query
+            session: Session to write through (opened if not given)
         """
         print("\n📝 Loading PYQs into graph...")
 
-        success_count = 0
-        failed_count = 0
+        rows = self._prepare_question_rows(pyqs_data)
+        success_count = self._bulk_create_questions(rows, batch_size,
+                                                    session=session)
+        failed_count = len(pyqs_data) - success_count
 
-        for question in tqdm(pyqs_data, desc="Loading questions"):
-            try:
-                result = self.create_question(question)
-                if result:
-                    success_count += 1
-                else:
-                    failed_count += 1
-            except Exception as e:
-                print(f"Error loading question: {e}")
-                failed_count += 1
+        print(f"✅ Loaded {success_count} questions ({failed_count} failed)")
+
+    def load_pyqs_stream(self, batches: Iterable[List[Dict]],
+                         session=None) -> int:
+        """
+        Load Previous Years Questions from an iterator of batches
+
+        The next batch is embedded while the previous one is written, so
+        at most two batches are held in memory at a time.
+
+        Args:
+            batches: Iterable yielding lists of question dictionaries
+            session: Session shared by all batches (opened if not given)
+
+        Returns:
+            Number of questions loaded
+        """
+        if session is None:
+            with self.session() as session:
+                return self.load_pyqs_stream(batches, session)
+
+        print("\n📝 Streaming PYQs into graph...")
+
+        success_count, failed_count, missing = self._write_behind(
+            batches, self._prepare_question_rows, self._bulk_create_questions, session
+        )
+        self._report_missing_topics(missing)
 
         print(f"✅ Loaded {success_count} questions ({failed_count} failed)")
+        return success_count
 
     # ============= Textbook Chunks Management =============
 
-    def create_chunk(self, chunk_data: Dict) -> Dict:
+    def create_chunk(self, chunk_data: Dict) -> bool:
         """
         Create a Chunk node with embedding
 
@@ -217,100 +528,196 @@ class GraphBuilder:
                 - source_file: Source filename
                 - page_number: Page number (optional)
                 - chunk_index: Chunk index in document
-                - embedding: Pre-computed embedding (optional)
+                - embedding: Pre-computed embedding, float32 array or
+                  list (optional)
+
+        Returns:
+            True if the chunk was created
+        """
+        rows = self._prepare_chunk_rows([chunk_data])
+        return self._bulk_create_chunks(rows, show_progress=False) > 0
+
+    def _prepare_chunk_rows(self, chunks: List[Dict],
+                            batch_size: int = 64,
+                            show_progress: bool = True) -> List[Dict]:
+        """
+        Build Cypher parameter rows for chunks, embedding any that lack one
+
+        Args:
+            chunks: List of chunk dictionaries
+            batch_size: Batch size for the embedding model
+            show_progress: Show the embedding progress bar for large inputs
+
+        Returns:
+            List of parameter rows with embeddings
         """
-        # Generate embedding if not provided
-        if 'embedding' not in chunk_data or not chunk_data['embedding']:
-            chunk_data['embedding'] = self.embedder.generate_embedding(
-                chunk_data['text']
+        embeddings = [chunk.get('embedding') for chunk in chunks]
+        missing = [idx for idx, embedding in enumerate(embeddings)
+                   if embedding is None or len(embedding) == 0]
+
+        if missing:
+            generated = self.embedder.generate_embeddings_batch(
+                [chunks[idx]['text'] for idx in missing],
+                batch_size=batch_size,
+                show_progress=show_progress and len(missing) > batch_size
             )
+            for idx, embedding in zip(missing, generated):
+                embeddings[idx] = embedding
+
+        return [
+            {
+                'subject': chunk_data['subject'],
+                'topic': chunk_data['topic'],
+                'text': chunk_data['text'],
+                'source_file': chunk_data.get('source_file', 'unknown'),
+                'page_number': chunk_data.get('page_number', 0),
+                'chunk_index': chunk_data.get('chunk_index', 0),
+                'embedding': embedding
+            }
+            for chunk_data, embedding in zip(chunks, embeddings)
+        ]
+
+    def _bulk_create_chunks(self, rows: List[Dict], batch_size: int = 500,
+                            show_progress: bool = True,
+                            missing: Optional[set] = None,
+                            session=None) -> int:
+        """
+        Create Chunk nodes in UNWIND batches
+
+        Rows whose topic does not exist are skipped inside the query and
+        reported afterwards, so no separate topic lookup is needed.
+        Embeddings are stored with db.create.setNodeVectorProperty, which
+        keeps them as a float32 array (half the size of a Cypher float list).
 
-        # Check if topic exists
-        topic_query = """
-        MATCH (t:Topic {name: $topic, subject: $subject})
-        RETURN t
+        Args:
+            rows: Parameter rows built by _prepare_chunk_rows
+            batch_size: Number of rows sent per query
+            show_progress: Show progress bar
+            missing: Set collecting (subject, topic) pairs that were not
+                found; when given, reporting is left to the caller
+            session: Session to write through (opened if not given)
+
+        Returns:
+            Number of chunks created
         """
-        topic_result = self.client.run_query(topic_query, {
-            'subject': chunk_data['subject'],
-            'topic': chunk_data['topic']
-        })
+        created = 0
+        report = missing is None
+        if report:
+            missing = set()
+        records = self._bulk_tx(_BULK_CREATE_CHUNKS_CYPHER, rows, batch_size,
+                                desc="Loading chunks", show_progress=show_progress,
+                                session=session)
+        for record in records:
+            created += record['created']
+            missing.update(tuple(pair) for pair in record['missing'])
+
+        if report:
+            self._report_missing_topics(missing)
+
+        return created
+
+    def _load_chunks_apoc(self, rows: List[Dict], batch_size: int = 1000,
+                          parallel: bool = False, retries: int = 3,
+                          session=None) -> int:
+        """
+        Create Chunk nodes with apoc.periodic.iterate
 
-        if not topic_result:
-            print(f"⚠️  Topic not found: {chunk_data['topic']} in {chunk_data['subject']}")
-            return None
+        All rows are sent in one call and batched and committed on the
+        server, which keeps transaction state small for very large loads.
+        Chunks of the same topic all lock that Topic node when linked, so
+        parallel batches are only worth enabling when chunks are spread
+        across many topics; failed batches are retried by APOC.
 
-        query = """
-        MATCH (t:Topic {name: $topic, subject: $subject})
-        CREATE (c:Chunk {
-            text: $text,
-            source_file: $source_file,
-            source_type: 'textbook',
-            page_number: $page_number,
-            chunk_index: $chunk_index,
-            embedding: $embedding,
-            created_at: datetime()
-        })
-        MERGE (t)-[:EXPLAINED_BY]->(c)
-        RETURN c
+        The call runs as an auto-commit query, not a managed transaction:
+        its batches commit on their own, so a driver retry of the whole
+        call would create the chunks of already committed batches again.
+
+        Args:
+            rows: Parameter rows built by _prepare_chunk_rows
+            batch_size: Number of rows per server-side transaction
+            parallel: Run batches in parallel
+            retries: Retries per failed batch
+            session: Session to write through (opened if not given)
+
+        Returns:
+            Number of nodes created
         """
+        if session is None:
+            with self.session() as session:
+                return self._load_chunks_apoc(rows, batch_size, parallel,
+                                              retries, session)
 
-        result = self.client.run_query(query, {
-            'subject': chunk_data['subject'],
-            'topic': chunk_data['topic'],
-            'text': chunk_data['text'],
-            'source_file': chunk_data.get('source_file', 'unknown'),
-            'page_number': chunk_data.get('page_number', 0),
-            'chunk_index': chunk_data.get('chunk_index', 0),
-            'embedding': chunk_data['embedding']
-        })
+        summary = session.run(_APOC_LOAD_CHUNKS_CYPHER, rows=rows,
+                              batch_size=batch_size, parallel=parallel,
+                              retries=retries,
+                              now=datetime.now(timezone.utc)).single().data()
 
-        return result[0] if result else None
+        if summary['failedBatches']:
+            print(f"❌ {summary['failedBatches']}/{summary['batches']} "
+                  f"batches failed: {summary['errorMessages']}")
 
-    def load_textbook_chunks(self, chunks_data: List[Dict], batch_size: int = 100):
+        return summary['created'] or 0
+
+    def load_textbook_chunks(self, chunks_data: List[Dict], batch_size: int = 500,
+                             use_apoc: bool = False, session=None):
         """
         Load textbook chunks into graph in batches
 
         Args:
             chunks_data: List of chunk dictionaries
-            batch_size: Number of chunks to process at once
+            batch_size: Number of chunks written per query
+            use_apoc: Batch on the server with apoc.periodic.iterate
+            session: Session to write through (opened if not given)
         """
         print(f"\n📖 Loading {len(chunks_data)} textbook chunks into graph...")
 
-        success_count = 0
-        failed_count = 0
+        rows = self._prepare_chunk_rows(chunks_data)
+        if use_apoc:
+            success_count = self._load_chunks_apoc(rows, batch_size,
+                                                   session=session)
+        else:
+            success_count = self._bulk_create_chunks(rows, batch_size,
+                                                     session=session)
+        failed_count = len(chunks_data) - success_count
 
-        # Process in batches
-        for i in tqdm(range(0, len(chunks_data), batch_size), desc="Loading chunks"):
-            batch = chunks_data[i:i + batch_size]
+        print(f"✅ Loaded {success_count} chunks ({failed_count} failed)")
 
-            for chunk in batch:
-                try:
-                    result = self.create_chunk(chunk)
-                    if result:
-                        success_count += 1
-                    else:
-                        failed_count += 1
-                except Exception as e:
-                    print(f"Error loading chunk: {e}")
-                    failed_count += 1
+    def load_textbook_chunks_stream(self, batches: Iterable[List[Dict]],
+                                    session=None) -> int:
+        """
+        Load textbook chunks from an iterator of batches
+
+        The next batch is pulled (and embedded, if needed) while the
+        previous one is written, so at most two batches are held in memory
+        at a time.
+
+        Args:
+            batches: Iterable yielding lists of chunk dictionaries
+            session: Session shared by all batches (opened if not given)
+
+        Returns:
+            Number of chunks loaded
+        """
+        if session is None:
+            with self.session() as session:
+                return self.load_textbook_chunks_stream(batches, session)
+
+        print("\n📖 Streaming textbook chunks into graph...")
+
+        success_count, failed_count, missing = self._write_behind(
+            batches, self._prepare_chunk_rows, self._bulk_create_chunks, session
+        )
+        self._report_missing_topics(missing)
 
         print(f"✅ Loaded {success_count} chunks ({failed_count} failed)")
+        return success_count
 
     # ============= Concept Management =============
 
     def create_concept(self, name: str, explanation: str,
                        topic_name: str, subject_name: str) -> Dict:
         """Create a Concept node and link to Topic"""
-        query = """
-        MATCH (t:Topic {name: $topic, subject: $subject})
-        MERGE (c:Concept {name: $name, topic: $topic, subject: $subject})
-        SET c.explanation = $explanation,
-            c.updated_at = datetime()
-        MERGE (t)-[:HAS_CONCEPT]->(c)
-        RETURN c
-        """
-
-        result = self.client.run_query(query, {
+        result = self.client.run_query(_CREATE_CONCEPT_CYPHER, {
             'name': name,
             'explanation': explanation,
             'topic': topic_name,
@@ -323,15 +730,25 @@ class GraphBuilder:
 
     def get_graph_statistics(self) -> Dict:
         """Get statistics about the knowledge graph"""
-        stats = {
-            'subjects': self.client.get_node_count('Subject'),
-            'topics': self.client.get_node_count('Topic'),
-            'questions': self.client.get_node_count('Question'),
-            'chunks': self.client.get_node_count('Chunk'),
-            'concepts': self.client.get_node_count('Concept'),
-        }
-
-        return stats
+        result = self.client.run_query(_GRAPH_STATISTICS_CYPHER)
+        if result:
+            return result[0]
+
+        return {'subjects': 0, 'topics': 0, 'questions': 0,
+                'chunks': 0, 'concepts': 0}
+
+    def refresh_question_counts(self) -> int:
+        """
+        Recompute the stored Topic.question_count from HAS_QUESTION edges
+
+        Question loads keep the count up to date; this repairs it, or
+        fills it in on graphs loaded before it existed.
+
+        Returns:
+            Number of topics updated
+        """
+        result = self.client.run_write_query(_REFRESH_QUESTION_COUNTS_CYPHER)
+        return result[0]['topics'] if result else 0
 
 
 # Example usage
@@ -1,12 +1,16 @@
 """
 Neo4j database client for managing connections and queries
+
+Schema (property and vector indexes) should be created with
+bootstrap_schema() before any data is loaded, so Neo4j maintains the
+indexes incrementally during bulk writes instead of building them over
+every existing node afterwards.
 """
 
-from neo4j import GraphDatabase
-from typing import List, Dict, Optional, Any
-import sys
+from functools import lru_cache
+from neo4j import AsyncGraphDatabase, GraphDatabase, READ_ACCESS
+from typing import Any, Dict, Iterator, List, Optional
 
-sys.path.append('../..')
 from config.config import config
 
 
@@ -18,7 +22,12 @@ class Neo4jClient:
         try:
             self.driver = GraphDatabase.driver(
                 config.NEO4J_URI,
-                auth=(config.NEO4J_USERNAME, config.NEO4J_PASSWORD)
+                auth=(config.NEO4J_USERNAME, config.NEO4J_PASSWORD),
+                max_connection_pool_size=config.NEO4J_POOL_SIZE,
+                connection_acquisition_timeout=config.NEO4J_ACQ_TIMEOUT,
+                connection_timeout=config.NEO4J_CONNECTION_TIMEOUT,
+                max_transaction_retry_time=config.NEO4J_MAX_RETRY_TIME,
+                keep_alive=True
             )
         except Exception as e:
             print(f"Failed to connect to Neo4j: {e}")
@@ -39,20 +48,27 @@ class Neo4jClient:
             print(f"✗ Neo4j connection failed: {e}")
             return False
 
-    def run_query(self, query: str, parameters: Dict = None) -> List[Dict]:
+    def run_query(self, query: str, parameters: Dict = None,
+                  fetch: bool = True) -> Optional[List[Dict]]:
         """
         Execute a Cypher query
 
         Args:
             query: Cypher query string
             parameters: Query parameters
+            fetch: Return records; pass False for statements run only for
+                their side effects, which discards results without
+                building a dict per record
 
         Returns:
-            Query results as list of dictionaries
+            Query results as list of dictionaries, or None if fetch is False
         """
         with self.driver.session() as session:
             try:
                 result = session.run(query, parameters or {})
+                if not fetch:
+                    result.consume()
+                    return None
                 return [record.data() for record in result]
             except Exception as e:
                 print(f"Query execution error: {e}")
@@ -60,6 +76,45 @@ class Neo4jClient:
                 print(f"Parameters: {parameters}")
                 raise
 
+    def stream_query(self, query: str, parameters: Dict = None) -> Iterator[Dict]:
+        """
+        Execute a read-only Cypher query, yielding records as they arrive
+
+        Unlike run_query, the result is never held in memory as a whole,
+        and the first record is available before the server has sent the
+        rest. The session stays open until the generator is exhausted or
+        closed.
+
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+
+        Yields:
+            One dictionary per record
+        """
+        with self.read_session() as session:
+            try:
+                for record in session.run(query, parameters or {}):
+                    yield record.data()
+            except Exception as e:
+                print(f"Query execution error: {e}")
+                print(f"Query: {query}")
+                print(f"Parameters: {parameters}")
+                raise
+
+    def read_session(self):
+        """
+        Open a read access session, to use as a context manager
+
+        Reads that belong together can share it (and one transaction)
+        instead of opening a session per run_query call; in a cluster it
+        is routed to a reader.
+
+        Returns:
+            Neo4j session in read access mode
+        """
+        return self.driver.session(default_access_mode=READ_ACCESS)
+
     def run_write_query(self, query: str, parameters: Dict = None) -> List[Dict]:
         """
         Execute a write query in a transaction
@@ -83,6 +138,44 @@ class Neo4jClient:
                 print(f"Write query error: {e}")
                 raise
 
+    def run_write_batch(self, query: str, rows: List[Dict], batch_size: int = 1000,
+                        parameters: Dict = None) -> List[Dict]:
+        """
+        Execute a write query over many rows, one transaction per batch
+
+        The query reads its batch from $rows, so per-row statements such as
+        CREATE (c:Chunk {text: $text}) should be written as
+        UNWIND $rows AS r CREATE (c:Chunk) SET c = r. All batches share one
+        session; each batch is one round-trip and is retried by the driver
+        on transient errors.
+
+        Args:
+            query: Cypher query reading the batch from $rows
+            rows: Parameter rows
+            batch_size: Number of rows per transaction
+            parameters: Extra parameters passed to every batch
+
+        Returns:
+            Query results from all batches
+        """
+
+        def execute_batch(tx, batch):
+            result = tx.run(query, {**(parameters or {}), 'rows': batch})
+            return [record.data() for record in result]
+
+        records = []
+        with self.driver.session() as session:
+            try:
+                for i in range(0, len(rows), batch_size):
+                    records.extend(
+                        session.execute_write(execute_batch, rows[i:i + batch_size])
+                    )
+            except Exception as e:
+                print(f"Batch write error: {e}")
+                raise
+
+        return records
+
     def create_indexes(self):
         """Create necessary indexes for performance"""
         print("Creating indexes...")
@@ -93,27 +186,57 @@ class Neo4jClient:
             "CREATE INDEX topic_subject IF NOT EXISTS FOR (t:Topic) ON (t.subject)",
             "CREATE INDEX question_year IF NOT EXISTS FOR (q:Question) ON (q.year)",
             "CREATE INDEX question_difficulty IF NOT EXISTS FOR (q:Question) ON (q.difficulty)",
+            # Composite index backing the (year, difficulty) question ordering
+            "CREATE INDEX question_year_diff IF NOT EXISTS FOR (q:Question) ON (q.year, q.difficulty)",
             "CREATE INDEX chunk_source IF NOT EXISTS FOR (c:Chunk) ON (c.source_type)",
             "CREATE INDEX concept_name IF NOT EXISTS FOR (c:Concept) ON (c.name)",
+            # Text index: equality lookups without the range index key-size limit
+            "CREATE TEXT INDEX question_text IF NOT EXISTS FOR (q:Question) ON (q.text)",
         ]
 
-        for index_query in indexes:
-            try:
-                self.run_query(index_query)
-            except Exception as e:
-                print(f"Index creation warning: {e}")
+        with self.driver.session() as session:
+            for index_query in indexes:
+                try:
+                    session.run(index_query).consume()
+                except Exception as e:
+                    print(f"Index creation warning: {e}")
 
         print("✓ Indexes created")
 
+    def bootstrap_schema(self, dimension: int = config.EMBEDDING_DIMENSION,
+                         quantization: Optional[bool] = None):
+        """
+        Create all indexes; call before loading any data
+
+        Args:
+            dimension: Embedding dimension for the vector index
+            quantization: Vector index quantization, see create_vector_index
+        """
+        self.create_indexes()
+        self.create_vector_index(dimension=dimension, quantization=quantization)
+
     def create_vector_index(self, index_name: str = "chunk_embeddings",
-                            dimension: int = 384):
+                            dimension: int = 384,
+                            similarity_function: str = "cosine",
+                            quantization: Optional[bool] = None):
         """
         Create vector index for similarity search
 
         Args:
             index_name: Name of the vector index
             dimension: Embedding dimension
+            similarity_function: 'cosine' or 'euclidean'; embeddings are
+                L2-normalized, so both rank results the same way
+            quantization: Let the index keep quantized copies of the
+                vectors, cutting its memory footprint at a small recall
+                cost (Neo4j 5.23+); None keeps the server default
         """
+        quantization_option = ""
+        if quantization is not None:
+            quantization_option = (
+                f",\n                `vector.quantization.enabled`: {str(quantization).lower()}"
+            )
+
         query = f"""
         CREATE VECTOR INDEX {index_name} IF NOT EXISTS
         FOR (c:Chunk)
@@ -121,13 +244,13 @@ class Neo4jClient:
         OPTIONS {{
             indexConfig: {{
                 `vector.dimensions`: {dimension},
-                `vector.similarity_function`: 'cosine'
+                `vector.similarity_function`: '{similarity_function}'{quantization_option}
             }}
         }}
         """
 
         try:
-            self.run_query(query)
+            self.run_query(query, fetch=False)
             print(f"✓ Vector index '{index_name}' created (dimension: {dimension})")
         except Exception as e:
             print(f"Vector index creation warning: {e}")
@@ -135,20 +258,146 @@ class Neo4jClient:
     def clear_database(self):
         """Clear all nodes and relationships (use with caution!)"""
         print("⚠️  WARNING: Clearing entire database...")
-        self.run_query("MATCH (n) DETACH DELETE n")
+        self.run_query("MATCH (n) DETACH DELETE n", fetch=False)
         print("✓ Database cleared")
 
     def get_node_count(self, label: str) -> int:
         """Get count of nodes with specific label"""
         query = f"MATCH (n:{label}) RETURN count(n) as count"
-        result = self.run_query(query)
-        return result[0]['count'] if result else 0
+        with self.driver.session() as session:
+            record = session.run(query).single()
+        return record['count'] if record else 0
 
     def get_all_labels(self) -> List[str]:
         """Get all node labels in database"""
-        query = "CALL db.labels()"
-        result = self.run_query(query)
-        return [r['label'] for r in result]
+        with self.driver.session() as session:
+            return [record['label'] for record in session.run("CALL db.labels()")]
+
+
+class AsyncNeo4jClient:
+    """Asyncio client for Neo4j, so database round-trips can overlap other work"""
+
+    def __init__(self):
+        """Initialize async Neo4j driver"""
+        try:
+            self.driver = AsyncGraphDatabase.driver(
+                config.NEO4J_URI,
+                auth=(config.NEO4J_USERNAME, config.NEO4J_PASSWORD),
+                max_connection_pool_size=config.NEO4J_POOL_SIZE,
+                connection_acquisition_timeout=config.NEO4J_ACQ_TIMEOUT,
+                connection_timeout=config.NEO4J_CONNECTION_TIMEOUT,
+                max_transaction_retry_time=config.NEO4J_MAX_RETRY_TIME,
+                keep_alive=True
+            )
+        except Exception as e:
+            print(f"Failed to connect to Neo4j: {e}")
+            raise
+
+    async def close(self):
+        """Close database connection"""
+        if self.driver:
+            await self.driver.close()
+
+    async def verify_connection(self):
+        """Verify database connectivity"""
+        try:
+            await self.driver.verify_connectivity()
+            print("✓ Connected to Neo4j")
+            return True
+        except Exception as e:
+            print(f"✗ Neo4j connection failed: {e}")
+            return False
+
+    async def run_query(self, query: str, parameters: Dict = None) -> List[Dict]:
+        """
+        Execute a read-only Cypher query
+
+        Runs in read access mode, so in a cluster it is routed to a
+        reader instead of the leader.
+
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+
+        Returns:
+            Query results as list of dictionaries
+        """
+        async with self.driver.session(default_access_mode=READ_ACCESS) as session:
+            try:
+                result = await session.run(query, parameters or {})
+                return await result.data()
+            except Exception as e:
+                print(f"Query execution error: {e}")
+                print(f"Query: {query}")
+                print(f"Parameters: {parameters}")
+                raise
+
+    async def run_write_query(self, query: str, parameters: Dict = None) -> List[Dict]:
+        """
+        Execute a write query in a transaction
+
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+
+        Returns:
+            Query results
+        """
+
+        async def execute_query(tx, query, params):
+            result = await tx.run(query, params)
+            return await result.data()
+
+        async with self.driver.session() as session:
+            try:
+                return await session.execute_write(execute_query, query, parameters or {})
+            except Exception as e:
+                print(f"Write query error: {e}")
+                raise
+
+    async def run_write_batch(self, query: str, rows: List[Dict], batch_size: int = 1000,
+                              parameters: Dict = None) -> List[Dict]:
+        """
+        Execute a write query over many rows, one transaction per batch
+
+        Args:
+            query: Cypher query reading the batch from $rows
+            rows: Parameter rows
+            batch_size: Number of rows per transaction
+            parameters: Extra parameters passed to every batch
+
+        Returns:
+            Query results from all batches
+        """
+
+        async def execute_batch(tx, batch):
+            result = await tx.run(query, {**(parameters or {}), 'rows': batch})
+            return await result.data()
+
+        records = []
+        async with self.driver.session() as session:
+            try:
+                for i in range(0, len(rows), batch_size):
+                    records.extend(
+                        await session.execute_write(execute_batch, rows[i:i + batch_size])
+                    )
+            except Exception as e:
+                print(f"Batch write error: {e}")
+                raise
+
+        return records
+
+    async def get_node_count(self, label: str) -> int:
+        """Get count of nodes with specific label"""
+        query = f"MATCH (n:{label}) RETURN count(n) as count"
+        result = await self.run_query(query)
+        return result[0]['count'] if result else 0
+
+
+@lru_cache(maxsize=None)
+def get_client() -> Neo4jClient:
+    """Get the shared Neo4j client so all callers reuse one driver pool"""
+    return Neo4jClient()
 
 
 # Example usage
@@ -0,0 +1,96 @@
+"""
+Content-addressed on-disk cache for embeddings
+"""
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+import hashlib
+import sqlite3
+import threading
+
+import numpy as np
+
+# SQLite caps the number of bound variables per statement
+_MAX_VARIABLES = 500
+
+
+class EmbeddingCache:
+    """Cache embeddings in SQLite, keyed by a hash of namespace and text"""
+
+    def __init__(self, path: str, namespace: str):
+        """
+        Open (or create) the cache
+
+        Args:
+            path: SQLite database file
+            namespace: Prefix mixed into every key, e.g. the model name,
+                backend and precision, so different model setups never
+                share entries
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key BLOB PRIMARY KEY,
+                vector BLOB NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+    def key(self, text: str) -> bytes:
+        """
+        Compute the cache key for a text
+
+        Args:
+            text: Raw input text
+
+        Returns:
+            16-byte BLAKE2b digest
+        """
+        data = f"{self.namespace}\0{text}".encode('utf-8')
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Look up several embeddings at once
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Mapping of found keys to float32 embeddings
+        """
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), _MAX_VARIABLES):
+                part = keys[i:i + _MAX_VARIABLES]
+                placeholders = ",".join("?" * len(part))
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    part
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        return found
+
+    def put_many(self, items: List[Tuple[bytes, np.ndarray]]):
+        """
+        Store several embeddings in one transaction
+
+        Vectors are stored as float16 to halve the cache size.
+
+        Args:
+            items: (key, embedding) pairs
+        """
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                ((key, np.asarray(vector, dtype=np.float16).tobytes())
+                 for key, vector in items)
+            )
+
+    def close(self):
+        """Close the underlying database"""
+        self.conn.close()
@@ -2,20 +2,30 @@
 Embeddings generation module using sentence-transformers
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+import os
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from tqdm import tqdm
-import sys
 
-sys.path.append('..')
 from config.config import config
+from src.ingestion.embedding_cache import EmbeddingCache
+
+# Quantized ONNX export published alongside the sentence-transformers models
+_ONNX_QINT8_FILE = 'onnx/model_qint8_avx512_vnni.onnx'
+
+# Minimum number of texts before encoding is spread over CPU worker processes;
+# kept below the 500-item batches that scripts/load_data.py streams in
+_MULTI_PROCESS_THRESHOLD = 256
 
 
 class EmbeddingsGenerator:
     """Generate embeddings for text chunks"""
 
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2',
+                 precision: str = 'fp16', backend: str = 'torch',
+                 cache_path: Optional[str] = config.EMBED_CACHE_PATH,
+                 multi_process: bool = True):
         """
         Initialize embeddings generator
 
@@ -25,17 +35,62 @@ class EmbeddingsGenerator:
                 - 'all-MiniLM-L6-v2' (384 dim, fast, default)
                 - 'all-mpnet-base-v2' (768 dim, better quality)
                 - 'all-MiniLM-L12-v2' (384 dim, balanced)
+            precision: 'fp16' to run in half precision when on CUDA, or
+                'fp32'; CPU inference always stays in fp32
+            backend: 'torch', or 'onnx' for CPU inference with the int8
+                quantized ONNX export (needs optimum[onnxruntime])
+            cache_path: SQLite file caching batch embeddings by content
+                hash; None or empty disables caching
+            multi_process: On CPU with the torch backend, encode large
+                inputs in one worker process per core
         """
-        print(f"Loading embedding model: {model_name}")
+        print(f"Loading embedding model: {model_name} ({backend})")
         try:
-            self.model = SentenceTransformer(model_name)
+            numerics = 'fp32'
+            if backend == 'onnx':
+                self.model, numerics = self._load_onnx_model(model_name)
+            else:
+                self.model = SentenceTransformer(model_name)
+                if precision == 'fp16' and self.model.device.type == 'cuda':
+                    self.model.half()
+                    numerics = 'fp16'
             self.dimension = self.model.get_sentence_embedding_dimension()
+            # Backends, precisions and quantization give slightly different
+            # vectors, so each combination keeps its own cache entries
+            namespace = f"{model_name}|{backend}|{numerics}"
+            self.cache = EmbeddingCache(cache_path, namespace) if cache_path else None
+            self.multi_process = (multi_process and backend == 'torch'
+                                  and self.model.device.type == 'cpu')
+            self._pool = None
             print(f"✅ Model loaded. Dimension: {self.dimension}")
         except Exception as e:
             print(f"❌ Failed to load model: {e}")
             raise
 
-    def generate_embedding(self, text: str) -> List[float]:
+    @staticmethod
+    def _load_onnx_model(model_name: str) -> Tuple[SentenceTransformer, str]:
+        """
+        Load the int8 quantized ONNX export of a model, exporting if needed
+
+        Args:
+            model_name: Name of sentence-transformers model
+
+        Returns:
+            SentenceTransformer running on ONNX Runtime, and 'qint8' or
+            'fp32' for the graph that was loaded
+        """
+        try:
+            model = SentenceTransformer(
+                model_name, backend='onnx',
+                model_kwargs={'file_name': _ONNX_QINT8_FILE}
+            )
+            return model, 'qint8'
+        except Exception as e:
+            # Not every model ships a quantized file; export the fp32 graph
+            print(f"⚠️  Quantized ONNX model unavailable ({e}), exporting fp32")
+            return SentenceTransformer(model_name, backend='onnx'), 'fp32'
+
+    def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text
 
@@ -43,96 +98,233 @@ class EmbeddingsGenerator:
             text: Input text
 
         Returns:
-            Embedding vector as list
+            Embedding vector as a float32 array
         """
         if not text or not text.strip():
             # Return zero vector for empty text
-            return [0.0] * self.dimension
+            return np.zeros(self.dimension, dtype=np.float32)
 
         try:
-            embedding = self.model.encode(text, convert_to_numpy=True)
-            return embedding.tolist()
+            embedding = self.model.encode(text, convert_to_numpy=True,
+                                          normalize_embeddings=True)
+            return embedding.astype(np.float32, copy=False)
         except Exception as e:
             print(f"Error generating embedding: {e}")
-            return [0.0] * self.dimension
+            return np.zeros(self.dimension, dtype=np.float32)
+
+    def _token_buckets(self, texts: List[str], batch_size: int,
+                       token_budget: int) -> List[np.ndarray]:
+        """
+        Group texts into length-sorted batches capped by padded token count
+
+        Texts are sorted by token length so each batch pads to a similar
+        length, and a batch is closed once batch_size texts or
+        token_budget padded tokens would be exceeded.
+
+        Args:
+            texts: List of non-empty texts
+            batch_size: Maximum number of texts per batch
+            token_budget: Maximum padded tokens (texts x longest) per batch
+
+        Returns:
+            List of index arrays into texts, one per batch
+        """
+        encoded = self.model.tokenizer(texts, truncation=True,
+                                       max_length=self.model.max_seq_length)
+        lengths = np.fromiter((len(ids) for ids in encoded['input_ids']),
+                              dtype=np.int64, count=len(texts))
+        order = np.argsort(lengths, kind='stable')
+
+        buckets = []
+        start = 0
+        for i, idx in enumerate(order):
+            size = i - start + 1
+            if i > start and (size > batch_size or size * lengths[idx] > token_budget):
+                buckets.append(order[start:i])
+                start = i
+        buckets.append(order[start:])
+
+        return buckets
+
+    def _encode(self, texts: List[str], batch_size: int, token_budget: int,
+                show_progress: bool) -> np.ndarray:
+        """
+        Encode non-empty texts in length-bucketed batches
+
+        Args:
+            texts: List of non-empty texts
+            batch_size: Maximum number of texts per batch
+            token_budget: Maximum padded tokens per batch
+            show_progress: Show progress bar
+
+        Returns:
+            Float32 array of shape (len(texts), dimension)
+        """
+        if self.multi_process and len(texts) > _MULTI_PROCESS_THRESHOLD:
+            embeddings = self.model.encode_multi_process(
+                texts, self._get_pool(), batch_size=batch_size,
+                normalize_embeddings=True
+            )
+            return embeddings.astype(np.float32, copy=False)
+
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        buckets = self._token_buckets(texts, batch_size, token_budget)
+
+        # Encode each bucket as one batch and write rows back in place
+        for bucket in tqdm(buckets, desc="Embedding", mininterval=0.5,
+                           disable=not show_progress):
+            embeddings[bucket] = self.model.encode(
+                [texts[idx] for idx in bucket],
+                batch_size=len(bucket),
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+
+        return embeddings
+
+    def _get_pool(self) -> Dict:
+        """Start the CPU worker pool on first use, one single-threaded worker per core"""
+        if self._pool is None:
+            # Workers read OMP_NUM_THREADS when torch loads, so each one
+            # uses a single thread instead of competing for every core
+            workers = os.cpu_count() or 1
+            print(f"Starting {workers} embedding worker processes...")
+            previous = os.environ.get('OMP_NUM_THREADS')
+            os.environ['OMP_NUM_THREADS'] = '1'
+            try:
+                self._pool = self.model.start_multi_process_pool(
+                    target_devices=['cpu'] * workers
+                )
+            finally:
+                if previous is None:
+                    del os.environ['OMP_NUM_THREADS']
+                else:
+                    os.environ['OMP_NUM_THREADS'] = previous
+        return self._pool
+
+    def _encode_cached(self, texts: List[str], batch_size: int, token_budget: int,
+                       show_progress: bool) -> np.ndarray:
+        """
+        Encode non-empty texts, reusing cached embeddings where possible
+
+        Only distinct texts missing from the cache are sent to the model,
+        so repeated boilerplate and re-runs of the pipeline are not
+        re-embedded.
+
+        Args:
+            texts: List of non-empty texts
+            batch_size: Maximum number of texts per batch
+            token_budget: Maximum padded tokens per batch
+            show_progress: Show progress bar
+
+        Returns:
+            Float32 array of shape (len(texts), dimension)
+        """
+        keys = [self.cache.key(text) for text in texts]
+        found = self.cache.get_many(list(set(keys)))
+
+        misses = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in misses:
+                misses[key] = text
+
+        if misses:
+            encoded = self._encode(list(misses.values()), batch_size,
+                                   token_budget, show_progress)
+            new_items = list(zip(misses.keys(), encoded))
+            self.cache.put_many(new_items)
+            found.update(new_items)
+
+        return np.stack([found[key] for key in keys])
 
     def generate_embeddings_batch(self, texts: List[str],
                                   batch_size: int = 32,
-                                  show_progress: bool = True) -> List[List[float]]:
+                                  show_progress: bool = True,
+                                  token_budget: int = 8192) -> np.ndarray:
         """
-        Generate embeddings for multiple texts in batches
+        Generate embeddings for multiple texts in length-bucketed batches
 
         Args:
             texts: List of input texts
-            batch_size: Batch size for processing
+            batch_size: Maximum number of texts per batch
             show_progress: Show progress bar
+            token_budget: Maximum padded tokens per batch
 
         Returns:
-            List of embedding vectors
+            Float32 array of shape (len(texts), dimension); empty texts
+            get zero vectors
         """
-        if not texts:
-            return []
+        # Preallocate so empty texts keep zero rows
+        result = np.zeros((len(texts), self.dimension), dtype=np.float32)
 
-        # Filter out empty texts and keep track of indices
-        valid_texts = []
-        valid_indices = []
+        if not texts:
+            return result
 
-        for idx, text in enumerate(texts):
-            if text and text.strip():
-                valid_texts.append(text)
-                valid_indices.append(idx)
+        # Mask out empty texts
+        mask = np.fromiter((bool(text and text.strip()) for text in texts),
+                           dtype=bool, count=len(texts))
+        valid_texts = [text for text, keep in zip(texts, mask) if keep]
 
         if not valid_texts:
-            return [[0.0] * self.dimension] * len(texts)
+            return result
 
         try:
-            # Generate embeddings for valid texts
-            embeddings = self.model.encode(
-                valid_texts,
-                batch_size=batch_size,
-                show_progress_bar=show_progress,
-                convert_to_numpy=True
-            )
-
-            # Create result list with proper indices
-            result = [[0.0] * self.dimension] * len(texts)
-            for valid_idx, original_idx in enumerate(valid_indices):
-                result[original_idx] = embeddings[valid_idx].tolist()
-
+            if self.cache is None:
+                # Encode each distinct text once and fan results back out
+                unique = {}
+                inverse = np.fromiter(
+                    (unique.setdefault(text, len(unique)) for text in valid_texts),
+                    dtype=np.int64, count=len(valid_texts)
+                )
+                embeddings = self._encode(list(unique), batch_size,
+                                          token_budget, show_progress)[inverse]
+            else:
+                embeddings = self._encode_cached(valid_texts, batch_size,
+                                                 token_budget, show_progress)
+
+            # Scatter embeddings back to their original positions
+            result[mask] = embeddings
             return result
 
         except Exception as e:
             print(f"Error in batch embedding generation: {e}")
-            return [[0.0] * self.dimension] * len(texts)
+            return result
 
     def embed_chunks(self, chunks: List[Dict],
-                     batch_size: int = 32) -> List[Dict]:
+                     batch_size: int = 32,
+                     show_progress: bool = True) -> List[Dict]:
         """
         Add embeddings to chunk dictionaries
 
         Args:
             chunks: List of chunk dictionaries
             batch_size: Batch size for processing
+            show_progress: Print status and show progress bar
 
         Returns:
-            Chunks with embeddings added
+            Chunks with embeddings added; each embedding is a float32 row
+            view into one contiguous array, not a list of Python floats
         """
         if not chunks:
             return []
 
-        print(f"Generating embeddings for {len(chunks)} chunks...")
+        if show_progress:
+            print(f"Generating embeddings for {len(chunks)} chunks...")
 
         # Extract texts
         texts = [chunk['text'] for chunk in chunks]
 
         # Generate embeddings
-        embeddings = self.generate_embeddings_batch(texts, batch_size)
+        embeddings = self.generate_embeddings_batch(texts, batch_size,
+                                                    show_progress=show_progress)
 
         # Add embeddings to chunks
         for chunk, embedding in zip(chunks, embeddings):
             chunk['embedding'] = embedding
 
-        print(f"✅ Generated {len(embeddings)} embeddings")
+        if show_progress:
+            print(f"✅ Generated {len(embeddings)} embeddings")
 
         return chunks
 
@@ -140,6 +332,15 @@ class EmbeddingsGenerator:
         """Get embedding dimension"""
         return self.dimension
 
+    def close(self):
+        """Stop CPU worker processes and close the embedding cache"""
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
 
 # Example usage
 if __name__ == "__main__":
@@ -4,11 +4,33 @@ Handles extraction from PYQs, textbooks, and syllabus documents
 """
 
 import pymupdf
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
 from tqdm import tqdm
+import os
 import re
 
+# Plain text extraction: join hyphenated line breaks, expand ligatures,
+# and skip text outside the page; reading order is not re-sorted
+_TEXT_FLAGS = (pymupdf.TEXT_DEHYPHENATE | pymupdf.TEXT_PRESERVE_WHITESPACE
+               | pymupdf.TEXT_MEDIABOX_CLIP)
+
+# Question markers: "Q.1", "Q 1", "Question 1", "1.", etc.
+_QUESTION_RE = re.compile(r'(?:Q\.?\s*|Question\s+)?(\d+)[\.\)]\s*')
+
+# MCQ options: (A), (B), (C), (D) or A), B), C), D)
+_OPTION_RE = re.compile(r'\(?([A-D])\)[\s:]+(.*?)(?=\(?[A-D]\)|$)', re.DOTALL)
+
+
+# Bullet characters and whitespace stripped from syllabus topic lines
+_BULLET_CHARS = '•-–—* \t'
+
+
+def _init_worker():
+    """Silence MuPDF warnings in worker processes"""
+    pymupdf.TOOLS.mupdf_display_errors(False)
+
 
 class PDFProcessor:
     """Extract text from PDF files using PyMuPDF"""
@@ -16,6 +38,27 @@ class PDFProcessor:
     def __init__(self):
         self.supported_formats = ['.pdf']
 
+    def iter_pages(self, pdf_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yield the text of a PDF one page at a time
+
+        Only the current page's text is held in memory, and the document
+        is closed even if the consumer stops early.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Yields:
+            Tuples of (page_number, text), page numbers starting at 1
+        """
+        doc = pymupdf.open(pdf_path)
+        try:
+            for page in doc:
+                yield page.number + 1, page.get_text("text", flags=_TEXT_FLAGS,
+                                                     sort=False)
+        finally:
+            doc.close()
+
     def extract_text_from_pdf(self, pdf_path: str) -> Dict[str, any]:
         """
         Extract text from a single PDF file
@@ -27,28 +70,22 @@ class PDFProcessor:
             Dict with metadata and text by page
         """
         try:
-            doc = pymupdf.open(pdf_path)
+            pages = [
+                {
+                    'page_number': page_number,
+                    'text': text,
+                    'word_count': len(text.split())
+                }
+                for page_number, text in self.iter_pages(pdf_path)
+            ]
 
-            result = {
+            return {
                 'file_path': pdf_path,
                 'file_name': Path(pdf_path).name,
-                'total_pages': len(doc),
-                'pages': []
+                'total_pages': len(pages),
+                'pages': pages
             }
 
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                text = page.get_text()
-
-                result['pages'].append({
-                    'page_number': page_num + 1,
-                    'text': text,
-                    'word_count': len(text.split())
-                })
-
-            doc.close()
-            return result
-
         except Exception as e:
             print(f"Error extracting text from {pdf_path}: {e}")
             return None
@@ -76,14 +113,17 @@ class PDFProcessor:
             print(f"No PDF files found in {directory_path}")
             return []
 
-        results = []
-        for pdf_file in tqdm(pdf_files, desc=f"Processing PDFs from {directory.name}"):
-            try:
-                extracted = self.extract_text_from_pdf(str(pdf_file))
-                if extracted:
-                    results.append(extracted)
-            except Exception as e:
-                print(f"Error processing {pdf_file}: {e}")
+        # One PDF per worker; failures are reported and returned as None
+        with ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                 initializer=_init_worker) as executor:
+            extracted = executor.map(self.extract_text_from_pdf,
+                                     [str(pdf_file) for pdf_file in pdf_files],
+                                     chunksize=4)
+            results = [
+                result for result in tqdm(extracted, total=len(pdf_files),
+                                          desc=f"Processing PDFs from {directory.name}")
+                if result
+            ]
 
         return results
 
@@ -100,12 +140,12 @@ class PDFProcessor:
         Returns:
             List of question dictionaries
         """
-        extracted = self.extract_text_from_pdf(pdf_path)
-        if not extracted:
+        try:
+            all_text = "\n".join(text for _, text in self.iter_pages(pdf_path))
+        except Exception as e:
+            print(f"Error extracting text from {pdf_path}: {e}")
             return []
 
-        all_text = "\n".join([p['text'] for p in extracted['pages']])
-
         # Extract questions using pattern matching
         questions = self._parse_questions(all_text, year, paper_set)
 
@@ -121,12 +161,8 @@ class PDFProcessor:
         """
         questions = []
 
-        # Split by question numbers
-        # Common patterns: "Q.1", "Q 1", "Question 1", "1.", etc.
-        question_pattern = r'(?:Q\.?\s*|Question\s+)?(\d+)[\.\)]\s*'
-
         # Split text by question markers
-        parts = re.split(question_pattern, text)
+        parts = _QUESTION_RE.split(text)
 
         # Process parts (odd indices are question numbers, even indices are content)
         for i in range(1, len(parts), 2):
@@ -140,15 +176,10 @@ class PDFProcessor:
                 continue
 
             # Extract options if present
-            options = self._extract_options(content)
-
-            # Clean question text (remove options from main text)
-            question_text = content
-            if options:
-                for opt in options:
-                    question_text = question_text.replace(opt, '')
+            options, options_start = self._extract_options(content)
 
-            question_text = question_text.strip()
+            # The question stem is everything before the first option
+            question_text = content[:options_start].strip()
 
             if len(question_text) < 10:  # Skip if too short
                 continue
@@ -166,16 +197,19 @@ class PDFProcessor:
 
         return questions
 
-    def _extract_options(self, text: str) -> List[str]:
-        """Extract MCQ options from text"""
-        options = []
-
-        # Pattern for options: (A), (B), (C), (D) or A), B), C), D)
-        option_pattern = r'\(?([A-D])\)[\s:]+(.*?)(?=\(?[A-D]\)|$)'
+    def _extract_options(self, text: str) -> Tuple[List[str], int]:
+        """
+        Extract MCQ options from text
 
-        matches = re.finditer(option_pattern, text, re.DOTALL)
+        Returns:
+            Tuple of (options, offset of the first option in text, or
+            len(text) if there are none)
+        """
+        options = []
+        options_start = len(text)
 
-        for match in matches:
+        for match in _OPTION_RE.finditer(text):
+            options_start = min(options_start, match.start())
             letter = match.group(1)
             option_text = match.group(2).strip()
 
@@ -185,7 +219,7 @@ class PDFProcessor:
             if option_text:
                 options.append(f"({letter}) {option_text}")
 
-        return options
+        return options, options_start
 
     def extract_syllabus_structure(self, pdf_path: str) -> Dict:
         """
@@ -197,12 +231,12 @@ class PDFProcessor:
         Returns:
             Dictionary with subjects and topics
         """
-        extracted = self.extract_text_from_pdf(pdf_path)
-        if not extracted:
+        try:
+            all_text = "\n".join(text for _, text in self.iter_pages(pdf_path))
+        except Exception as e:
+            print(f"Error extracting text from {pdf_path}: {e}")
             return {}
 
-        all_text = "\n".join([p['text'] for p in extracted['pages']])
-
         # This is a basic implementation
         # You'll need to customize based on your syllabus format
         syllabus = self._parse_syllabus(all_text)
@@ -218,28 +252,27 @@ class PDFProcessor:
         # Example structure - customize as needed
         syllabus = {}
 
-        # Simple line-by-line parsing
-        lines = text.split('\n')
-        current_subject = None
+        # Simple line-by-line parsing (splitlines also handles \r\n)
+        topics = None
 
-        for line in lines:
-            line = line.strip()
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
             if not line:
                 continue
 
             # Check if line looks like a subject heading (all caps or title case)
             if line.isupper() or (line.istitle() and len(line.split()) <= 5):
-                current_subject = line
-                syllabus[current_subject] = {
+                syllabus[line] = {
                     'description': '',
                     'topics': []
                 }
-            elif current_subject:
+                topics = syllabus[line]['topics']
+            elif topics is not None:
                 # Assume it's a topic
                 # Clean and add
-                topic_name = line.strip('•-–—*').strip()
-                if topic_name and len(topic_name) > 3:
-                    syllabus[current_subject]['topics'].append({
+                topic_name = line.strip(_BULLET_CHARS)
+                if len(topic_name) > 3:
+                    topics.append({
                         'name': topic_name,
                         'description': '',
                         'difficulty': 2  # Default medium difficulty
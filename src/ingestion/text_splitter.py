@@ -2,34 +2,57 @@
 Text chunking module for splitting documents into manageable pieces
 """
 
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Tuple
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-import sys
 
-sys.path.append('..')
 from config.config import config
 
 
 class TextChunker:
     """Split text into chunks for embedding and retrieval"""
 
-    def __init__(self, chunk_size: int = None, chunk_overlap: int = None):
+    def __init__(self, chunk_size: int = None, chunk_overlap: int = None,
+                 tokenizer=None):
         """
         Initialize text chunker
 
         Args:
-            chunk_size: Size of each chunk (default from config)
-            chunk_overlap: Overlap between chunks (default from config)
+            chunk_size: Size of each chunk (default from config). With a
+                tokenizer, pass the embedding model's sequence limit
+                (max_seq_length less its special tokens) to keep chunks
+                from being truncated; the default is only capped at the
+                tokenizer's model_max_length, which can be looser.
+            chunk_overlap: Overlap between chunks (default from config).
+                With a tokenizer the default keeps config's overlap ratio
+                (CHUNK_OVERLAP / CHUNK_SIZE) of the token chunk size, so
+                it stays about 20% rather than 100 tokens
+            tokenizer: Optional Hugging Face tokenizer (e.g. the embedding
+                model's); when given, sizes are measured in its tokens
+                instead of characters
         """
         self.chunk_size = chunk_size or config.CHUNK_SIZE
+        if tokenizer is not None and not chunk_size:
+            self.chunk_size = min(self.chunk_size, tokenizer.model_max_length)
         self.chunk_overlap = chunk_overlap or config.CHUNK_OVERLAP
-
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
+        if tokenizer is not None and not chunk_overlap:
+            self.chunk_overlap = (config.CHUNK_OVERLAP * self.chunk_size
+                                  // config.CHUNK_SIZE)
+        separators = ["\n\n", "\n", ". ", " ", ""]
+
+        if tokenizer is not None:
+            self.splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+                tokenizer,
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                separators=separators
+            )
+        else:
+            self.splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                length_function=len,
+                separators=separators
+            )
 
     def chunk_text(self, text: str, metadata: Dict = None) -> List[Dict]:
         """
@@ -47,17 +70,70 @@ class TextChunker:
 
         chunks = self.splitter.split_text(text)
 
+        return [self._make_chunk(idx, chunk, metadata)
+                for idx, chunk in enumerate(chunks)]
+
+    def _make_chunk(self, idx: int, chunk: str, metadata: Dict = None) -> Dict:
+        """Build a chunk dictionary with its own copy of metadata"""
+        text = chunk.strip()
+        return {
+            'chunk_id': idx,
+            'text': text,
+            'char_count': len(text),
+            'word_count': len(text.split()),
+            'metadata': dict(metadata) if metadata else {}
+        }
+
+    def chunk_pages(self, pages: Iterable[Tuple[int, str]],
+                    metadata: Dict = None) -> List[Dict]:
+        """
+        Chunk a document page by page
+
+        Each page is split as it arrives; the last piece of a page is
+        carried over and re-split together with the next page, so chunks
+        still span page breaks while only one page of raw text is held at
+        a time.
+
+        Args:
+            pages: Iterable of (page_number, text), e.g.
+                PDFProcessor.iter_pages
+            metadata: Additional metadata to attach
+
+        Returns:
+            List of chunk dictionaries with the page each chunk starts on
+        """
         result = []
-        for idx, chunk in enumerate(chunks):
-            chunk_dict = {
-                'chunk_id': idx,
-                'text': chunk.strip(),
-                'char_count': len(chunk),
-                'word_count': len(chunk.split()),
-                'metadata': metadata or {}
-            }
+        carry = ""
+        carry_page = None
+
+        def emit(chunk: str, page_number: int):
+            chunk_dict = self._make_chunk(len(result), chunk, metadata)
+            chunk_dict['page_number'] = page_number
             result.append(chunk_dict)
 
+        for page_number, text in pages:
+            if not text.strip():
+                continue
+
+            if carry:
+                text = carry + "\n\n" + text
+            else:
+                carry_page = page_number
+
+            pieces = self.splitter.split_text(text)
+            if not pieces:
+                carry = ""
+                continue
+
+            # The last piece may continue on the next page
+            for piece in pieces[:-1]:
+                emit(piece, carry_page)
+                carry_page = page_number
+            carry = pieces[-1]
+
+        if carry.strip():
+            emit(carry, carry_page)
+
         return result
 
     def chunk_document(self, document: Dict,
@@ -74,12 +150,6 @@ class TextChunker:
         Returns:
             List of chunks with document metadata
         """
-        # Combine all pages
-        all_text = "\n\n".join([
-            page['text'] for page in document['pages']
-            if page['text'].strip()
-        ])
-
         metadata = {
             'file_name': document['file_name'],
             'total_pages': document['total_pages'],
@@ -91,9 +161,12 @@ class TextChunker:
         if topic:
             metadata['topic'] = topic
 
-        chunks = self.chunk_text(all_text, metadata)
+        chunks = self.chunk_pages(
+            ((page['page_number'], page['text']) for page in document['pages']),
+            metadata
+        )
 
-        # Add page number information to each chunk
+        # Add source file information to each chunk
         for chunk in chunks:
             chunk['source_file'] = document['file_name']
 
@@ -2,14 +2,145 @@
 Track user learning progress and performance
 """
 
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Tuple
 from datetime import datetime
-import sys
-
-sys.path.append('../..')
+import threading
+import time
 
 from src.graph.neo4j_client import Neo4jClient
 
+# Seconds a cached stats read stays fresh; writes invalidate immediately
+_CACHE_TTL = 30
+
+# Maximum number of cached stats reads
+_CACHE_MAXSIZE = 256
+
+# ============= Cypher Queries =============
+
+_RECORD_ATTEMPTS_CYPHER = """
+    UNWIND $rows AS row
+    MATCH (u:User {id: 'default_user'})
+    USING INDEX u:User(id)
+    MATCH (t:Topic {name: row.topic, subject: row.subject})
+    USING INDEX t:Topic(name, subject)
+    // Reached through the topic's own questions, so no hint is needed
+    MATCH (t)-[:HAS_QUESTION]->(q:Question {text: row.question_text})
+
+    MERGE (u)-[a:ATTEMPTED]->(q)
+    ON CREATE SET
+        a.first_attempt = datetime(),
+        a.attempt_count = 1,
+        a.correct_count = CASE WHEN row.is_correct THEN 1 ELSE 0 END,
+        a.last_correct = CASE WHEN row.is_correct THEN datetime() ELSE null END
+    ON MATCH SET
+        a.last_attempt = datetime(),
+        a.attempt_count = a.attempt_count + 1,
+        a.correct_count = a.correct_count + CASE WHEN row.is_correct THEN 1 ELSE 0 END,
+        a.last_correct = CASE WHEN row.is_correct THEN datetime() ELSE a.last_correct END
+
+    // Keep per-topic totals up to date so reads never sum ATTEMPTED edges
+    MERGE (u)-[s:TOPIC_STATS]->(t)
+    ON CREATE SET s.attempts = 0, s.correct = 0
+    SET s.attempts = s.attempts + 1,
+        s.correct = s.correct + CASE WHEN row.is_correct THEN 1 ELSE 0 END
+    SET s.accuracy = s.correct * 100.0 / s.attempts
+"""
+
+# Same write without the index hints, for graphs whose duplicate User or
+# Topic nodes keep the constraints behind them from being created
+_RECORD_ATTEMPTS_UNHINTED_CYPHER = "\n".join(
+    line for line in _RECORD_ATTEMPTS_CYPHER.splitlines()
+    if "USING INDEX" not in line
+)
+
+# Number of online range indexes the hints rely on (2 when both exist)
+_HINT_INDEXES_CYPHER = """
+    SHOW INDEXES YIELD type, labelsOrTypes, properties, state
+    WHERE type = 'RANGE' AND state = 'ONLINE'
+      AND ((labelsOrTypes = ['User'] AND properties = ['id'])
+        OR (labelsOrTypes = ['Topic'] AND properties = ['name', 'subject']))
+    RETURN count(*) AS found
+"""
+
+# The constraints back the index hints in _RECORD_ATTEMPTS_CYPHER
+_PROGRESS_SCHEMA = [
+    "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE",
+    "CREATE CONSTRAINT topic_unique IF NOT EXISTS FOR (t:Topic) REQUIRE (t.name, t.subject) IS UNIQUE",
+    "CREATE TEXT INDEX question_text IF NOT EXISTS FOR (q:Question) ON (q.text)",
+    "CREATE INDEX topic_stats_accuracy IF NOT EXISTS FOR ()-[s:TOPIC_STATS]-() ON (s.accuracy)",
+]
+
+# One query text for every filter combination, so Neo4j plans it once
+_USER_STATS_CYPHER = """
+    MATCH (:User {id: 'default_user'})-[s:TOPIC_STATS]->(t:Topic)
+    WHERE ($subject IS NULL OR t.subject = $subject)
+      AND ($topic IS NULL OR t.name = $topic)
+    WITH sum(s.attempts) AS total_attempts,
+         sum(s.correct) AS total_correct
+    RETURN total_attempts,
+           total_correct,
+           CASE WHEN total_attempts > 0
+                THEN toFloat(total_correct) / total_attempts * 100
+                ELSE 0 END AS accuracy
+"""
+
+_REBUILD_TOPIC_STATS_CYPHER = """
+    MATCH (u:User {id: 'default_user'})-[a:ATTEMPTED]->(q:Question)<-[:HAS_QUESTION]-(t:Topic)
+    WITH u, t, sum(a.attempt_count) AS attempts, sum(a.correct_count) AS correct
+    MERGE (u)-[s:TOPIC_STATS]->(t)
+    SET s.attempts = attempts,
+        s.correct = correct,
+        s.accuracy = correct * 100.0 / attempts
+"""
+
+# True on databases whose attempts predate the TOPIC_STATS counters, or
+# whose counters predate the stored accuracy the weak topics filter uses
+_NEEDS_STATS_BACKFILL_CYPHER = """
+    MATCH (u:User {id: 'default_user'})
+    RETURN (EXISTS { (u)-[:ATTEMPTED]->(:Question) }
+            AND NOT EXISTS { (u)-[:TOPIC_STATS]->(:Topic) })
+           OR EXISTS { (u)-[s:TOPIC_STATS]->(:Topic) WHERE s.accuracy IS NULL } AS needed
+"""
+
+# total_questions counts the topic's questions the user has attempted;
+# topics without TOPIC_STATS have none, so their questions are not walked
+_TOPIC_PROGRESS_CYPHER = """
+    MATCH (t:Topic {subject: $subject})
+    OPTIONAL MATCH (:User {id: 'default_user'})-[s:TOPIC_STATS]->(t)
+    WITH t,
+         CASE WHEN s IS NULL THEN 0
+              ELSE COUNT { (t)-[:HAS_QUESTION]->(:Question)
+                           <-[:ATTEMPTED]-(:User {id: 'default_user'}) }
+         END AS total_questions,
+         s.attempts AS attempts,
+         s.correct AS correct
+    RETURN t.name AS topic,
+           t.difficulty_level AS difficulty,
+           total_questions,
+           COALESCE(attempts, 0) AS attempts,
+           COALESCE(correct, 0) AS correct,
+           CASE WHEN attempts > 0
+                THEN toFloat(correct) / attempts * 100
+                ELSE 0 END AS accuracy
+    ORDER BY t.name
+"""
+
+# Filters on the indexed TOPIC_STATS accuracy and stops after the 10 weakest
+_WEAK_TOPICS_CYPHER = """
+    MATCH (:User {id: 'default_user'})-[s:TOPIC_STATS]->(t:Topic)
+    WHERE s.accuracy < $threshold
+      AND s.attempts >= 3
+      AND ($subject IS NULL OR t.subject = $subject)
+    RETURN t.name AS topic,
+           t.subject AS subject,
+           t.difficulty_level AS difficulty,
+           s.attempts AS attempts,
+           s.correct AS correct,
+           s.accuracy AS accuracy
+    ORDER BY s.accuracy ASC, s.attempts DESC
+    LIMIT 10
+"""
+
 
 class ProgressTracker:
     """Track user progress and performance"""
@@ -22,17 +153,46 @@ class ProgressTracker:
             neo4j_client: Neo4j client instance
         """
         self.client = neo4j_client
+        # Shared by every session's thread; the generation counts clears,
+        # so a read that overlapped a write is not cached after it
+        self._stats_cache: Dict[tuple, Tuple[float, Any]] = {}
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
         self._ensure_progress_nodes()
 
     def _ensure_progress_nodes(self):
-        """Ensure User and Progress nodes exist"""
+        """Ensure lookup indexes and the User node exist"""
+        # Index the lookups made by every attempt write
+        for schema_query in _PROGRESS_SCHEMA:
+            try:
+                self.client.run_query(schema_query, fetch=False)
+            except Exception as e:
+                print(f"Index creation warning: {e}")
+
+        # A hint on a missing index fails every attempt write, so only use
+        # the hinted query when both backing indexes are in place
+        self._record_attempts_cypher = _RECORD_ATTEMPTS_CYPHER
+        try:
+            found = self.client.run_query(_HINT_INDEXES_CYPHER)[0]['found']
+        except Exception:
+            found = 0
+        if found < 2:
+            print("⚠️  User/Topic uniqueness indexes missing; recording attempts without index hints")
+            self._record_attempts_cypher = _RECORD_ATTEMPTS_UNHINTED_CYPHER
+
         # Create default user if not exists
         query = """
         MERGE (u:User {id: 'default_user'})
         SET u.created_at = COALESCE(u.created_at, datetime())
         RETURN u
         """
-        self.client.run_query(query)
+        self.client.run_query(query, fetch=False)
+
+        # Reads only use TOPIC_STATS, so fill it in for older attempts
+        result = self.client.run_query(_NEEDS_STATS_BACKFILL_CYPHER)
+        if result and result[0]['needed']:
+            print("Backfilling topic stats from recorded attempts...")
+            self.rebuild_topic_stats()
 
     def record_attempt(self, subject: str, topic: str,
                        question_text: str, is_correct: bool):
@@ -45,35 +205,94 @@ class ProgressTracker:
             question_text: Question text
             is_correct: Whether answer was correct
         """
-        query = """
-        MATCH (u:User {id: 'default_user'})
-        MATCH (t:Topic {name: $topic, subject: $subject})
-        MATCH (t)-[:HAS_QUESTION]->(q:Question {text: $question_text})
+        self.record_attempts_batch([{
+            'subject': subject,
+            'topic': topic,
+            'question_text': question_text,
+            'is_correct': is_correct
+        }])
+
+    def record_attempts_batch(self, attempts: List[Dict]):
+        """
+        Record several question attempts in one transaction
 
-        MERGE (u)-[a:ATTEMPTED]->(q)
-        ON CREATE SET 
-            a.first_attempt = datetime(),
-            a.attempt_count = 1,
-            a.correct_count = CASE WHEN $is_correct THEN 1 ELSE 0 END,
-            a.last_correct = CASE WHEN $is_correct THEN datetime() ELSE null END
-        ON MATCH SET
-            a.last_attempt = datetime(),
-            a.attempt_count = a.attempt_count + 1,
-            a.correct_count = a.correct_count + CASE WHEN $is_correct THEN 1 ELSE 0 END,
-            a.last_correct = CASE WHEN $is_correct THEN datetime() ELSE a.last_correct END
+        Args:
+            attempts: List of dictionaries with keys subject, topic,
+                question_text and is_correct
+        """
+        if not attempts:
+            return
 
-        RETURN a
+        try:
+            self.client.run_write_batch(self._record_attempts_cypher, attempts)
+        except Exception as e:
+            print(f"Error recording attempts: {e}")
+        finally:
+            self.clear_cache()
+
+    def rebuild_topic_stats(self):
         """
+        Recompute TOPIC_STATS counters from ATTEMPTED relationships
 
+        Runs automatically on startup for attempts recorded before the
+        counters existed; call it directly to repair them.
+        """
         try:
-            self.client.run_query(query, {
-                'subject': subject,
-                'topic': topic,
-                'question_text': question_text,
-                'is_correct': is_correct
-            })
+            self.client.run_write_query(_REBUILD_TOPIC_STATS_CYPHER)
         except Exception as e:
-            print(f"Error recording attempt: {e}")
+            print(f"Error rebuilding topic stats: {e}")
+        finally:
+            self.clear_cache()
+
+    def clear_cache(self):
+        """Drop all cached stats reads, including ones still loading"""
+        with self._cache_lock:
+            self._stats_cache.clear()
+            self._cache_generation += 1
+
+    def _cached(self, key: tuple, load: Callable[[], Any]) -> Any:
+        """
+        Return a fresh cached result for key, or load and cache it
+
+        Results are only cached when load succeeds, so a failed query is
+        retried on the next call, and only if the cache was not cleared
+        while loading, so a write during the query is not hidden.
+
+        Args:
+            key: Cache key, e.g. (method, subject, topic)
+            load: Function running the query
+
+        Returns:
+            Cached or freshly loaded result
+        """
+        with self._cache_lock:
+            entry = self._stats_cache.get(key)
+            generation = self._cache_generation
+        if entry and time.monotonic() - entry[0] < _CACHE_TTL:
+            return entry[1]
+
+        # Query outside the lock so other threads are not held up
+        value = load()
+        self._store(key, value, generation)
+        return value
+
+    def _store(self, key: tuple, value: Any, generation: int):
+        """
+        Cache a result under key, evicting the oldest entry when full
+
+        Args:
+            key: Cache key
+            value: Loaded result
+            generation: _cache_generation read before the load started;
+                the result is dropped if the cache was cleared since
+        """
+        with self._cache_lock:
+            if generation != self._cache_generation:
+                return
+            if key not in self._stats_cache and len(self._stats_cache) >= _CACHE_MAXSIZE:
+                # Dicts keep insertion order, so this evicts the oldest entry
+                self._stats_cache.pop(next(iter(self._stats_cache)))
+            self._stats_cache[key] = (time.monotonic(), value)
 
     def get_user_stats(self, subject: str = None,
                        topic: str = None) -> Dict:
@@ -87,51 +306,17 @@ class ProgressTracker:
         Returns:
             Dictionary with statistics
         """
-        if topic and subject:
-            # Topic-specific stats
-            query = """
-            MATCH (u:User {id: 'default_user'})-[a:ATTEMPTED]->(q:Question)
-            MATCH (q)<-[:HAS_QUESTION]-(t:Topic {name: $topic, subject: $subject})
-            WITH sum(a.attempt_count) AS total_attempts,
-                 sum(a.correct_count) AS total_correct
-            RETURN total_attempts,
-                   total_correct,
-                   CASE WHEN total_attempts > 0 
-                        THEN toFloat(total_correct) / total_attempts * 100 
-                        ELSE 0 END AS accuracy
-            """
-            result = self.client.run_query(query, {
-                'subject': subject,
-                'topic': topic
-            })
-        elif subject:
-            # Subject-specific stats
-            query = """
-            MATCH (u:User {id: 'default_user'})-[a:ATTEMPTED]->(q:Question)
-            MATCH (q)<-[:HAS_QUESTION]-(t:Topic {subject: $subject})
-            WITH sum(a.attempt_count) AS total_attempts,
-                 sum(a.correct_count) AS total_correct
-            RETURN total_attempts,
-                   total_correct,
-                   CASE WHEN total_attempts > 0 
-                        THEN toFloat(total_correct) / total_attempts * 100 
-                        ELSE 0 END AS accuracy
-            """
-            result = self.client.run_query(query, {'subject': subject})
-        else:
-            # Overall stats
-            query = """
-            MATCH (u:User {id: 'default_user'})-[a:ATTEMPTED]->(q:Question)
-            WITH sum(a.attempt_count) AS total_attempts,
-                 sum(a.correct_count) AS total_correct
-            RETURN total_attempts,
-                   total_correct,
-                   CASE WHEN total_attempts > 0 
-                        THEN toFloat(total_correct) / total_attempts * 100 
-                        ELSE 0 END AS accuracy
-            """
-            result = self.client.run_query(query)
+        params = {'subject': subject, 'topic': topic}
+        result = self._cached(
+            ('user_stats', subject, topic),
+            lambda: self.client.run_query(_USER_STATS_CYPHER, params)
+        )
 
+        return self._to_user_stats(result)
+
+    @staticmethod
+    def _to_user_stats(result: List[Dict]) -> Dict:
+        """Convert a _USER_STATS_CYPHER result to a statistics dictionary"""
         if result and result[0]:
             return {
                 'attempted': result[0].get('total_attempts', 0) or 0,
@@ -149,29 +334,14 @@ class ProgressTracker:
             subject: Subject name
 
         Returns:
-            List of topic progress dictionaries
-        """
-        query = """
-        MATCH (t:Topic {subject: $subject})
-        OPTIONAL MATCH (t)-[:HAS_QUESTION]->(q:Question)<-[a:ATTEMPTED]-(u:User {id: 'default_user'})
-        WITH t, 
-             count(DISTINCT q) AS total_questions,
-             sum(a.attempt_count) AS attempts,
-             sum(a.correct_count) AS correct
-        RETURN t.name AS topic,
-               t.difficulty_level AS difficulty,
-               total_questions,
-               COALESCE(attempts, 0) AS attempts,
-               COALESCE(correct, 0) AS correct,
-               CASE WHEN attempts > 0 
-                    THEN toFloat(correct) / attempts * 100 
-                    ELSE 0 END AS accuracy
-        ORDER BY t.name
+            List of topic progress dictionaries; total_questions is the
+            number of the topic's questions the user has attempted
         """
-
         try:
-            results = self.client.run_query(query, {'subject': subject})
-            return results
+            return self._cached(
+                ('topic_progress', subject),
+                lambda: self.client.run_query(_TOPIC_PROGRESS_CYPHER, {'subject': subject})
+            )
         except Exception as e:
             print(f"Error getting topic progress: {e}")
             return []
@@ -188,40 +358,58 @@ class ProgressTracker:
         Returns:
             List of weak topics
         """
-        query = """
-        MATCH (t:Topic)
+        try:
+            params = {'subject': subject, 'threshold': threshold}
+            return self._cached(('weak_topics', subject, threshold),
+                                lambda: self.client.run_query(_WEAK_TOPICS_CYPHER, params))
+        except Exception as e:
+            print(f"Error getting weak topics: {e}")
+            return []
+
+    def dashboard(self, subject: str, threshold: float = 60.0) -> Dict:
         """
+        Get subject stats, topic progress and weak topics together
+
+        All three queries run in one read transaction on one session, so
+        the dashboard costs a single session checkout and sees one
+        consistent snapshot. Results also populate the per-method cache.
 
-        if subject:
-            query += "WHERE t.subject = $subject\n"
+        Args:
+            subject: Subject name
+            threshold: Accuracy threshold for weak topics (default 60%)
 
-        query += """
-        MATCH (t)-[:HAS_QUESTION]->(q:Question)<-[a:ATTEMPTED]-(u:User {id: 'default_user'})
-        WITH t,
-             sum(a.attempt_count) AS attempts,
-             sum(a.correct_count) AS correct,
-             toFloat(sum(a.correct_count)) / sum(a.attempt_count) * 100 AS accuracy
-        WHERE attempts >= 3 AND accuracy < $threshold
-        RETURN t.name AS topic,
-               t.subject AS subject,
-               t.difficulty_level AS difficulty,
-               attempts,
-               correct,
-               accuracy
-        ORDER BY accuracy ASC, attempts DESC
-        LIMIT 10
+        Returns:
+            Dictionary with keys stats, topic_progress and weak_topics
         """
 
-        try:
-            params = {'threshold': threshold}
-            if subject:
-                params['subject'] = subject
+        def read_all(tx):
+            return (
+                tx.run(_USER_STATS_CYPHER, subject=subject, topic=None).data(),
+                tx.run(_TOPIC_PROGRESS_CYPHER, subject=subject).data(),
+                tx.run(_WEAK_TOPICS_CYPHER, subject=subject, threshold=threshold).data()
+            )
 
-            results = self.client.run_query(query, params)
-            return results
+        generation = self._cache_generation
+        try:
+            with self.client.read_session() as session:
+                stats, topic_progress, weak_topics = session.execute_read(read_all)
         except Exception as e:
-            print(f"Error getting weak topics: {e}")
-            return []
+            print(f"Error getting dashboard: {e}")
+            return {
+                'stats': self._to_user_stats([]),
+                'topic_progress': [],
+                'weak_topics': []
+            }
+
+        self._store(('user_stats', subject, None), stats, generation)
+        self._store(('topic_progress', subject), topic_progress, generation)
+        self._store(('weak_topics', subject, threshold), weak_topics, generation)
+
+        return {
+            'stats': self._to_user_stats(stats),
+            'topic_progress': topic_progress,
+            'weak_topics': weak_topics
+        }
 
 
 # Example usage
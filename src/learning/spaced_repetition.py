@@ -2,52 +2,195 @@
 Spaced repetition system using FSRS algorithm
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from fsrs import FSRS, Card, Rating, ReviewLog
 import json
+import sqlite3
+import time
 from pathlib import Path
 
+# FSRS scheduling state stored with every card
+_FSRS_FIELDS = ('due', 'stability', 'difficulty', 'elapsed_days',
+                'scheduled_days', 'reps', 'lapses', 'state', 'last_review')
+
+# Due date as epoch seconds, kept next to the ISO string so reads compare
+# floats instead of parsing dates
+_STATE_COLUMNS = _FSRS_FIELDS + ('due_ts',)
+
+_CARD_COLUMNS = ('id', 'subject', 'topic', 'front', 'back') + _STATE_COLUMNS + (
+    'created_at', 'last_reviewed')
+
+_INSERT_CARD_SQL = "INSERT OR IGNORE INTO cards ({}) VALUES ({})".format(
+    ", ".join(_CARD_COLUMNS), ", ".join("?" * len(_CARD_COLUMNS)))
+
+# Only updates the card if nobody reviewed it since it was read
+_UPDATE_FSRS_SQL = (
+    "UPDATE cards SET {}, last_reviewed = ? WHERE id = ? AND last_reviewed IS ?".format(
+        ", ".join(f"{field} = ?" for field in _STATE_COLUMNS))
+)
+
+# Map user ratings to FSRS ratings
+_RATING_MAP = {
+    1: Rating.Again,
+    2: Rating.Hard,
+    3: Rating.Good,
+    4: Rating.Easy
+}
+
 
 class SpacedRepetitionManager:
     """Manage flashcards with spaced repetition"""
 
-    def __init__(self, storage_file: str = "data/processed/flashcards.json"):
+    def __init__(self, storage_file: str = "data/processed/flashcards.db"):
         """
         Initialize spaced repetition manager
 
+        Cards found in a legacy flashcards.json next to storage_file are
+        imported the first time the database is created.
+
         Args:
-            storage_file: File to store flashcard data
+            storage_file: SQLite database to store flashcard data
         """
         self.storage_file = Path(storage_file)
         self.storage_file.parent.mkdir(parents=True, exist_ok=True)
 
         self.fsrs = FSRS()
-        self.cards = self._load_cards()
+        # Scheduled FSRS cards by id, with the last_reviewed value they were
+        # stored with, so repeat reviews skip the SELECT and reconstruction
+        self._fsrs_cards: Dict[str, Tuple[Card, Optional[str]]] = {}
+        self.conn = sqlite3.connect(self.storage_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # Write-ahead log: a review appends its changed pages to the log
+        # instead of rewriting the database, and SQLite checkpoints the log
+        # back in the background; fsync only at checkpoints
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._import_json(self.storage_file.with_suffix('.json'))
+
+    def _create_schema(self):
+        """Create the cards table and its due-date indexes"""
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS cards (
+                    id TEXT PRIMARY KEY,
+                    subject TEXT,
+                    topic TEXT,
+                    front TEXT,
+                    back TEXT,
+                    due TEXT,
+                    stability REAL,
+                    difficulty REAL,
+                    elapsed_days INTEGER,
+                    scheduled_days INTEGER,
+                    reps INTEGER,
+                    lapses INTEGER,
+                    state INTEGER,
+                    last_review TEXT,
+                    due_ts REAL,
+                    created_at TEXT,
+                    last_reviewed TEXT
+                )
+            """)
+            self._add_due_ts_column()
+
+            # One index per filter combination used by get_due_cards, so
+            # each variant is a range scan already in due order
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_due ON cards (subject, topic, due_ts)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_subject_due ON cards (subject, due_ts)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_due_only ON cards (due_ts)"
+            )
+
+    def _add_due_ts_column(self):
+        """Add and backfill due_ts in databases created before it existed"""
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(cards)")}
+        if 'due_ts' in columns:
+            return
 
-    def _load_cards(self) -> Dict[str, Dict]:
-        """Load flashcards from storage"""
-        if self.storage_file.exists():
-            try:
-                with open(self.storage_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading flashcards: {e}")
-                return {}
-        return {}
+        self.conn.execute("ALTER TABLE cards ADD COLUMN due_ts REAL")
+        self.conn.executemany(
+            "UPDATE cards SET due_ts = ? WHERE id = ?",
+            [(self._to_timestamp(row['due']), row['id'])
+             for row in self.conn.execute("SELECT id, due FROM cards")]
+        )
+
+        # These indexes were on the ISO due column
+        for index in ('idx_due', 'idx_subject_due', 'idx_due_only'):
+            self.conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+    @staticmethod
+    def _to_timestamp(due: str) -> float:
+        """Convert an ISO due date to epoch seconds"""
+        return datetime.fromisoformat(due).timestamp()
+
+    def _import_json(self, json_file: Path):
+        """Import cards from the old JSON storage into an empty database"""
+        if not json_file.exists():
+            return
+        if self.conn.execute("SELECT 1 FROM cards LIMIT 1").fetchone():
+            return
 
-    def _save_cards(self):
-        """Save flashcards to storage"""
         try:
-            with open(self.storage_file, 'w') as f:
-                json.dump(self.cards, f, indent=2, default=str)
+            with open(json_file, 'r') as f:
+                cards = json.load(f)
         except Exception as e:
-            print(f"Error saving flashcards: {e}")
+            print(f"Error loading flashcards: {e}")
+            return
+
+        rows = [
+            tuple(card.get(column) for column in ('id', 'subject', 'topic', 'front', 'back'))
+            + tuple(card['fsrs_state'].get(field) for field in _FSRS_FIELDS)
+            + (self._to_timestamp(card['fsrs_state']['due']),)
+            + (card.get('created_at'), card.get('last_reviewed'))
+            for card in cards.values()
+        ]
+        with self.conn:
+            self.conn.executemany(_INSERT_CARD_SQL, rows)
+        print(f"✅ Imported {len(rows)} flashcards from {json_file}")
+
+    @classmethod
+    def _fsrs_values(cls, fsrs_card: Card, due: str = None) -> tuple:
+        """Serialize FSRS card state in _STATE_COLUMNS order"""
+        due = due or fsrs_card.due.isoformat()
+        return (
+            due,
+            fsrs_card.stability,
+            fsrs_card.difficulty,
+            fsrs_card.elapsed_days,
+            fsrs_card.scheduled_days,
+            fsrs_card.reps,
+            fsrs_card.lapses,
+            fsrs_card.state.value,
+            fsrs_card.last_review.isoformat() if fsrs_card.last_review else None,
+            cls._to_timestamp(due)
+        )
+
+    @staticmethod
+    def _row_to_card(row: sqlite3.Row) -> Dict:
+        """Convert a cards row to the flashcard dictionary format"""
+        return {
+            'id': row['id'],
+            'subject': row['subject'],
+            'topic': row['topic'],
+            'front': row['front'],
+            'back': row['back'],
+            'fsrs_state': {field: row[field] for field in _FSRS_FIELDS},
+            'created_at': row['created_at'],
+            'last_reviewed': row['last_reviewed']
+        }
 
-    def add_cards(self, flashcards: List[Dict]):
+    def add_cards(self, flashcards: List[Dict], autosave: bool = True):
         """
         Add new flashcards
 
+        Cards whose id already exists are left unchanged.
+
         Args:
             flashcards: List of flashcard dictionaries with keys:
                 - id: Unique identifier
@@ -55,37 +198,38 @@ class SpacedRepetitionManager:
                 - topic: Topic name
                 - front: Question side
                 - back: Answer side
+            autosave: Commit immediately. Pass False when adding cards for
+                many topics in a row and call save() once at the end; the
+                database stays write-locked for other connections until then
         """
+        # New cards are due immediately; one timestamp serves the batch
+        now_iso = datetime.now().isoformat()
+
+        rows = []
         for card in flashcards:
-            card_id = card['id']
-
-            if card_id not in self.cards:
-                # Create new FSRS card
-                fsrs_card = Card()
-
-                self.cards[card_id] = {
-                    'id': card_id,
-                    'subject': card['subject'],
-                    'topic': card['topic'],
-                    'front': card['front'],
-                    'back': card['back'],
-                    'fsrs_state': {
-                        'due': datetime.now().isoformat(),
-                        'stability': fsrs_card.stability,
-                        'difficulty': fsrs_card.difficulty,
-                        'elapsed_days': fsrs_card.elapsed_days,
-                        'scheduled_days': fsrs_card.scheduled_days,
-                        'reps': fsrs_card.reps,
-                        'lapses': fsrs_card.lapses,
-                        'state': fsrs_card.state.value,
-                        'last_review': fsrs_card.last_review.isoformat() if fsrs_card.last_review else None
-                    },
-                    'created_at': datetime.now().isoformat()
-                }
-
-        self._save_cards()
+            # Create new FSRS card
+            fsrs_card = Card()
+            rows.append(
+                (card['id'], card['subject'], card['topic'], card['front'], card['back'])
+                + self._fsrs_values(fsrs_card, due=now_iso)
+                + (now_iso, None)
+            )
+
+        try:
+            self.conn.executemany(_INSERT_CARD_SQL, rows)
+            if autosave:
+                self.save()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"Error saving flashcards: {e}")
+            return
+
         print(f"✅ Added {len(flashcards)} flashcards")
 
+    def save(self):
+        """Commit cards added with autosave=False"""
+        self.conn.commit()
+
     def get_due_cards(self, subject: str = None,
                       topic: str = None) -> List[Dict]:
         """
@@ -96,27 +240,22 @@ class SpacedRepetitionManager:
             topic: Optional topic filter
 
         Returns:
-            List of due flashcards
+            List of due flashcards, most overdue first
         """
-        now = datetime.now()
-        due_cards = []
-
-        for card_id, card in self.cards.items():
-            # Apply filters
-            if subject and card['subject'] != subject:
-                continue
-            if topic and card['topic'] != topic:
-                continue
+        query = "SELECT * FROM cards WHERE due_ts <= ?"
+        params = [time.time()]
 
-            # Check if due
-            due_date = datetime.fromisoformat(card['fsrs_state']['due'])
-            if due_date <= now:
-                due_cards.append(card)
+        # Apply filters
+        if subject:
+            query += " AND subject = ?"
+            params.append(subject)
+        if topic:
+            query += " AND topic = ?"
+            params.append(topic)
 
-        # Sort by due date (most overdue first)
-        due_cards.sort(key=lambda x: datetime.fromisoformat(x['fsrs_state']['due']))
+        query += " ORDER BY due_ts"
 
-        return due_cards
+        return [self._row_to_card(row) for row in self.conn.execute(query, params)]
 
     def review_card(self, card_id: str, rating: int):
         """
@@ -126,54 +265,65 @@ class SpacedRepetitionManager:
             card_id: Flashcard ID
             rating: User rating (1=Again, 2=Hard, 3=Good, 4=Easy)
         """
-        if card_id not in self.cards:
-            print(f"Card not found: {card_id}")
-            return
+        # A second pass re-reads the card when another session reviewed it
+        # between our read and the guarded update
+        for attempt in range(2):
+            cached = self._fsrs_cards.get(card_id) if attempt == 0 else None
+            if cached is None:
+                row = self.conn.execute(
+                    "SELECT * FROM cards WHERE id = ?", (card_id,)
+                ).fetchone()
+
+                if row is None:
+                    print(f"Card not found: {card_id}")
+                    return
+
+                fsrs_card, last_reviewed = self._row_to_fsrs_card(row), row['last_reviewed']
+            else:
+                fsrs_card, last_reviewed = cached
+
+            fsrs_rating = _RATING_MAP.get(rating, Rating.Good)
+
+            # Schedule next review
+            scheduling_cards = self.fsrs.repeat(fsrs_card, datetime.now())
+            updated_card = scheduling_cards[fsrs_rating].card
+            reviewed_at = datetime.now().isoformat()
+
+            # Update stored card
+            try:
+                with self.conn:
+                    cursor = self.conn.execute(
+                        _UPDATE_FSRS_SQL,
+                        self._fsrs_values(updated_card)
+                        + (reviewed_at, card_id, last_reviewed)
+                    )
+            except Exception as e:
+                print(f"Error saving flashcards: {e}")
+                return
 
-        card_data = self.cards[card_id]
-        fsrs_state = card_data['fsrs_state']
+            if cursor.rowcount:
+                self._fsrs_cards[card_id] = (updated_card, reviewed_at)
+                return
 
-        # Reconstruct FSRS Card object
-        fsrs_card = Card()
-        fsrs_card.stability = fsrs_state['stability']
-        fsrs_card.difficulty = fsrs_state['difficulty']
-        fsrs_card.elapsed_days = fsrs_state['elapsed_days']
-        fsrs_card.scheduled_days = fsrs_state['scheduled_days']
-        fsrs_card.reps = fsrs_state['reps']
-        fsrs_card.lapses = fsrs_state['lapses']
-        fsrs_card.state = fsrs_state['state']
-        if fsrs_state['last_review']:
-            fsrs_card.last_review = datetime.fromisoformat(fsrs_state['last_review'])
-
-        # Map rating to FSRS Rating
-        rating_map = {
-            1: Rating.Again,
-            2: Rating.Hard,
-            3: Rating.Good,
-            4: Rating.Easy
-        }
+            # Reviewed elsewhere since it was read; retry from the database
+            self._fsrs_cards.pop(card_id, None)
 
-        fsrs_rating = rating_map.get(rating, Rating.Good)
-
-        # Schedule next review
-        scheduling_cards = self.fsrs.repeat(fsrs_card, datetime.now())
-        updated_card = scheduling_cards[fsrs_rating].card
-
-        # Update stored card
-        card_data['fsrs_state'] = {
-            'due': updated_card.due.isoformat(),
-            'stability': updated_card.stability,
-            'difficulty': updated_card.difficulty,
-            'elapsed_days': updated_card.elapsed_days,
-            'scheduled_days': updated_card.scheduled_days,
-            'reps': updated_card.reps,
-            'lapses': updated_card.lapses,
-            'state': updated_card.state.value,
-            'last_review': updated_card.last_review.isoformat() if updated_card.last_review else None
-        }
-        card_data['last_reviewed'] = datetime.now().isoformat()
+        print(f"⚠️  Review of card {card_id} not saved: it kept changing concurrently")
 
-        self._save_cards()
+    @staticmethod
+    def _row_to_fsrs_card(row: sqlite3.Row) -> Card:
+        """Reconstruct an FSRS Card object from a cards row"""
+        fsrs_card = Card()
+        fsrs_card.stability = row['stability']
+        fsrs_card.difficulty = row['difficulty']
+        fsrs_card.elapsed_days = row['elapsed_days']
+        fsrs_card.scheduled_days = row['scheduled_days']
+        fsrs_card.reps = row['reps']
+        fsrs_card.lapses = row['lapses']
+        fsrs_card.state = row['state']
+        if row['last_review']:
+            fsrs_card.last_review = datetime.fromisoformat(row['last_review'])
+        return fsrs_card
 
     def get_stats(self, subject: str = None) -> Dict:
         """
@@ -185,23 +335,19 @@ class SpacedRepetitionManager:
         Returns:
             Statistics dictionary
         """
-        total = 0
-        due = 0
-        learned = 0
-
-        now = datetime.now()
-
-        for card in self.cards.values():
-            if subject and card['subject'] != subject:
-                continue
-
-            total += 1
+        query = """
+            SELECT count(*) AS total,
+                   coalesce(sum(due_ts <= ?), 0) AS due,
+                   coalesce(sum(reps >= 3), 0) AS learned
+            FROM cards
+        """
+        params = [time.time()]
 
-            if datetime.fromisoformat(card['fsrs_state']['due']) <= now:
-                due += 1
+        if subject:
+            query += " WHERE subject = ?"
+            params.append(subject)
 
-            if card['fsrs_state']['reps'] >= 3:
-                learned += 1
+        total, due, learned = self.conn.execute(query, params).fetchone()
 
         return {
             'total': total,
@@ -210,6 +356,10 @@ class SpacedRepetitionManager:
             'retention_rate': (learned / total * 100) if total > 0 else 0
         }
 
+    def close(self):
+        """Close the flashcard database"""
+        self.conn.close()
+
 
 # Example usage
 if __name__ == "__main__":
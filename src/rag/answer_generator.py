@@ -2,33 +2,269 @@
 Answer generation using Google Gemini API
 """
 
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
+import asyncio
+import json
+
 from google import genai
-import sys
+from google.genai import types
+from pydantic import BaseModel, TypeAdapter
 
-sys.path.append('../..')
 from config.config import config
+from src.rag.response_cache import ResponseCache
+
+
+class GeneratedQuestion(BaseModel):
+    """Response schema for one generated practice question"""
+    question: str
+    options: List[str]
+    answer: str
+    explanation: str
+
+
+class GeneratedFlashcard(BaseModel):
+    """Response schema for one generated flashcard"""
+    front: str
+    back: str
+
+
+# Structured output: Gemini returns JSON matching the schema, so no
+# free-text parsing is needed
+_QUESTIONS_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=list[GeneratedQuestion]
+)
+
+_FLASHCARDS_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=list[GeneratedFlashcard]
+)
+
+
+# ============= Prompt Templates =============
+# Static prose lives here; builders fill placeholders with str.format and
+# join variable-length context instead of growing a string with +=
+
+_EXPLANATION_HEADER = """You are an expert tutor preparing students for the GATE Computer Science exam.
+
+Subject: {subject}
+Topic: {topic}
+
+Question: {question}
+Correct Answer: {answer}
+
+"""
+
+_EXPLANATION_FOOTER = """
+Please provide a detailed explanation that:
+1. Explains why the correct answer is right
+2. Explains why other options are wrong (if applicable)
+3. Provides the underlying concept with examples
+4. Gives tips to remember this concept
+
+Keep the explanation clear, concise, and helpful for exam preparation.
+"""
+
+_TEACH_HEADER = """You are an expert teacher for GATE Computer Science preparation.
+
+Subject: {subject}
+Topic: {topic}
+Topic Description: {description}
+Difficulty Level: {difficulty}/5
+
+Student's Question: {query}
+
+Relevant Study Material:
+"""
+
+_TEACH_FOOTER = """
+Based on the above context, provide a comprehensive explanation that:
+1. Directly answers the student's question
+2. Explains the core concepts with clear examples
+3. Relates concepts to real-world applications
+4. Highlights key points for GATE exam preparation
+5. Provides practice tips
+
+Make the explanation engaging and easy to understand.
+"""
+
+_QUESTIONS_HEADER = """You are creating GATE Computer Science practice questions.
+
+Subject: {subject}
+Topic: {topic}
+Difficulty Level: {difficulty}/5 (1=Easy, 5=Very Hard)
+Number of Questions: {num_questions}
+
+"""
+
+_QUESTIONS_FOOTER = """
+Generate {num_questions} multiple-choice questions similar to GATE pattern:
+- Each question should test conceptual understanding
+- Provide 4 options, each starting with its letter: (A), (B), (C), (D)
+- Give the letter of the correct answer
+- Provide a brief explanation
+"""
+
+_READING_MATERIAL_PROMPT = """You are creating study material for GATE Computer Science preparation.
+
+Subject: {subject}
+Topic: {topic}
+
+Source Material:
+{context}
+
+Create a comprehensive, well-structured study guide that:
+1. Starts with an introduction to the topic
+2. Explains key concepts in a logical sequence
+3. Provides examples and illustrations
+4. Highlights important points for GATE exam
+5. Ends with a summary of key takeaways
+
+Structure the content with clear headings and subheadings.
+Make it suitable for self-study and revision.
+"""
+
+_FLASHCARDS_PROMPT = """Create {num_cards} flashcards for GATE Computer Science preparation.
+
+Subject: {subject}
+Topic: {topic}
+
+For each flashcard:
+- Front: A clear, concise question or prompt
+- Back: A detailed answer with key points
+"""
 
 
 class AnswerGenerator:
     """Generate answers and explanations using Gemini"""
 
-    def __init__(self, model_name: str = "gemini-2.0-flash-exp"):
+    def __init__(self, model_name: str = "gemini-2.0-flash-exp",
+                 cache_path: Optional[str] = config.GEMINI_CACHE_PATH):
         """
         Initialize answer generator
 
         Args:
             model_name: Gemini model to use
+            cache_path: SQLite file caching responses by prompt; identical
+                prompts are answered from disk instead of the API. Pass
+                None or "" to disable
         """
         try:
             genai.configure(api_key=config.GEMINI_API_KEY)
             self.client = genai.Client()
             self.model_name = model_name
+            self.cache = ResponseCache(cache_path, model_name) if cache_path else None
             print(f"✅ Gemini API initialized with model: {model_name}")
         except Exception as e:
             print(f"❌ Failed to initialize Gemini: {e}")
             raise
 
+    @staticmethod
+    def _config_id(generation_config: Optional[types.GenerateContentConfig]) -> str:
+        """Serialize a generation config, including its response schema, for cache keys"""
+        if generation_config is None:
+            return ""
+        settings = generation_config.model_dump(mode='json', exclude_none=True,
+                                                exclude={'response_schema'})
+        schema = generation_config.response_schema
+        if schema is not None:
+            # Pydantic types are recorded by their fields, so changing a
+            # schema model also changes the key
+            if isinstance(schema, types.Schema):
+                settings['response_schema'] = schema.model_dump(mode='json', exclude_none=True)
+            else:
+                settings['response_schema'] = TypeAdapter(schema).json_schema()
+        return json.dumps(settings, sort_keys=True)
+
+    def _cache_key(self, prompt: str, generation_config: types.GenerateContentConfig = None,
+                   use_cache: bool = True) -> Optional[bytes]:
+        """Cache key for a prompt and config, or None when caching is off"""
+        if not (self.cache and use_cache):
+            return None
+        return self.cache.key(prompt, self._config_id(generation_config))
+
+    def _generate(self, prompt: str,
+                  generation_config: types.GenerateContentConfig = None,
+                  use_cache: bool = True) -> str:
+        """
+        Generate text for a prompt, reusing a cached response if present
+
+        Args:
+            prompt: Full prompt text
+            generation_config: Optional generation config, e.g. a JSON schema
+            use_cache: Read and write the response cache; False for calls
+                that should give a fresh result every time
+
+        Returns:
+            Response text
+        """
+        key = self._cache_key(prompt, generation_config, use_cache)
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self.client.models.generate_content(
+            model=self.model_name,
+            contents=prompt,
+            config=generation_config
+        )
+
+        if key and response.text:
+            self.cache.put(key, response.text)
+        return response.text
+
+    async def _agenerate(self, prompt: str,
+                         generation_config: types.GenerateContentConfig = None,
+                         use_cache: bool = True) -> str:
+        """Async version of _generate"""
+        key = self._cache_key(prompt, generation_config, use_cache)
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = await self.client.aio.models.generate_content(
+            model=self.model_name,
+            contents=prompt,
+            config=generation_config
+        )
+
+        if key and response.text:
+            self.cache.put(key, response.text)
+        return response.text
+
+    def _generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream text for a prompt as it is generated
+
+        A cached response is yielded in one piece; otherwise the full
+        text is cached once the stream completes.
+
+        Args:
+            prompt: Full prompt text
+
+        Yields:
+            Response text fragments
+        """
+        key = self._cache_key(prompt)
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        for chunk in self.client.models.generate_content_stream(
+                model=self.model_name,
+                contents=prompt):
+            if chunk.text:
+                parts.append(chunk.text)
+                yield chunk.text
+
+        if key and parts:
+            self.cache.put(key, "".join(parts))
+
     def generate_explanation(self, question: str, answer: str,
                              subject: str, topic: str,
                              context: List[Dict] = None) -> str:
@@ -45,41 +281,39 @@ class AnswerGenerator:
         Returns:
             Explanation text
         """
-        # Build prompt with context
-        prompt = f"""You are an expert tutor preparing students for the GATE Computer Science exam.
+        prompt = self._explanation_prompt(question, answer, subject, topic, context)
 
-Subject: {subject}
-Topic: {topic}
-
-Question: {question}
-Correct Answer: {answer}
-
-"""
-
-        if context:
-            prompt += "\nRelevant study material:\n"
-            for chunk in context[:3]:
-                prompt += f"- {chunk.get('text', '')[:200]}...\n"
-
-        prompt += """
-Please provide a detailed explanation that:
-1. Explains why the correct answer is right
-2. Explains why other options are wrong (if applicable)
-3. Provides the underlying concept with examples
-4. Gives tips to remember this concept
+        try:
+            return self._generate(prompt)
+        except Exception as e:
+            print(f"Error generating explanation: {e}")
+            return "Error generating explanation. Please try again."
 
-Keep the explanation clear, concise, and helpful for exam preparation.
-"""
+    def generate_explanation_stream(self, question: str, answer: str,
+                                    subject: str, topic: str,
+                                    context: List[Dict] = None) -> Iterator[str]:
+        """Streaming version of generate_explanation, e.g. for st.write_stream"""
+        prompt = self._explanation_prompt(question, answer, subject, topic, context)
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-            return response.text
+            yield from self._generate_stream(prompt)
         except Exception as e:
             print(f"Error generating explanation: {e}")
-            return "Error generating explanation. Please try again."
+            yield "Error generating explanation. Please try again."
+
+    def _explanation_prompt(self, question: str, answer: str,
+                            subject: str, topic: str,
+                            context: List[Dict] = None) -> str:
+        """Build the explanation prompt"""
+        parts = [_EXPLANATION_HEADER.format(subject=subject, topic=topic,
+                                            question=question, answer=answer)]
+
+        if context:
+            parts.append("\nRelevant study material:\n")
+            parts.extend(f"- {chunk.get('text', '')[:200]}...\n" for chunk in context[:3])
+
+        parts.append(_EXPLANATION_FOOTER)
+        return "".join(parts)
 
     def teach(self, query: str, subject: str, topic: str,
               context: Dict) -> str:
@@ -95,45 +329,42 @@ Keep the explanation clear, concise, and helpful for exam preparation.
         Returns:
             Teaching content
         """
-        # Extract relevant context
-        topic_info = context.get('topic_info', {})
-        relevant_chunks = context.get('relevant_chunks', [])
-
-        prompt = f"""You are an expert teacher for GATE Computer Science preparation.
+        prompt = self._teach_prompt(query, subject, topic, context)
 
-Subject: {subject}
-Topic: {topic}
-Topic Description: {topic_info.get('description', 'N/A')}
-Difficulty Level: {topic_info.get('difficulty', 'N/A')}/5
-
-Student's Question: {query}
-
-Relevant Study Material:
-"""
-
-        for idx, chunk in enumerate(relevant_chunks[:5], 1):
-            prompt += f"\n{idx}. {chunk.get('text', '')[:300]}...\n"
-
-        prompt += """
-Based on the above context, provide a comprehensive explanation that:
-1. Directly answers the student's question
-2. Explains the core concepts with clear examples
-3. Relates concepts to real-world applications
-4. Highlights key points for GATE exam preparation
-5. Provides practice tips
+        try:
+            return self._generate(prompt)
+        except Exception as e:
+            print(f"Error in teach mode: {e}")
+            return "Error generating teaching content. Please try again."
 
-Make the explanation engaging and easy to understand.
-"""
+    def teach_stream(self, query: str, subject: str, topic: str,
+                     context: Dict) -> Iterator[str]:
+        """Streaming version of teach, e.g. for st.write_stream"""
+        prompt = self._teach_prompt(query, subject, topic, context)
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-            return response.text
+            yield from self._generate_stream(prompt)
         except Exception as e:
             print(f"Error in teach mode: {e}")
-            return "Error generating teaching content. Please try again."
+            yield "Error generating teaching content. Please try again."
+
+    def _teach_prompt(self, query: str, subject: str, topic: str,
+                      context: Dict) -> str:
+        """Build the teaching prompt"""
+        topic_info = context.get('topic_info', {})
+        relevant_chunks = context.get('relevant_chunks', [])
+
+        parts = [_TEACH_HEADER.format(
+            subject=subject,
+            topic=topic,
+            description=topic_info.get('description', 'N/A'),
+            difficulty=topic_info.get('difficulty', 'N/A'),
+            query=query
+        )]
+        parts.extend(f"\n{idx}. {chunk.get('text', '')[:300]}...\n"
+                     for idx, chunk in enumerate(relevant_chunks[:5], 1))
+        parts.append(_TEACH_FOOTER)
+        return "".join(parts)
 
     def generate_practice_questions(self, subject: str, topic: str,
                                     num_questions: int = 5,
@@ -152,102 +383,77 @@ Make the explanation engaging and easy to understand.
         Returns:
             List of generated questions
         """
-        prompt = f"""You are creating GATE Computer Science practice questions.
+        prompt = self._practice_questions_prompt(subject, topic, num_questions,
+                                                 difficulty, example_questions)
 
-Subject: {subject}
-Topic: {topic}
-Difficulty Level: {difficulty}/5 (1=Easy, 5=Very Hard)
-Number of Questions: {num_questions}
-
-"""
-
-        if example_questions:
-            prompt += "\nExample questions from previous GATE papers:\n"
-            for idx, eq in enumerate(example_questions[:3], 1):
-                prompt += f"\n{idx}. {eq.get('question', '')}\n"
-                if eq.get('options'):
-                    for opt in eq['options']:
-                        prompt += f"   {opt}\n"
+        try:
+            # Not cached: asking again should give new questions
+            text = self._generate(prompt, _QUESTIONS_CONFIG, use_cache=False)
+            return self._to_questions(text)
 
-        prompt += f"""
-Generate {num_questions} multiple-choice questions similar to GATE pattern:
-- Each question should test conceptual understanding
-- Provide 4 options (A, B, C, D)
-- Indicate the correct answer
-- Provide a brief explanation
+        except Exception as e:
+            print(f"Error generating questions: {e}")
+            return []
 
-Format each question as:
-Question [N]:
-[Question text]
-(A) [Option A]
-(B) [Option B]
-(C) [Option C]
-(D) [Option D]
-Correct Answer: [Letter]
-Explanation: [Brief explanation]
-
----
-"""
+    async def agenerate_practice_questions(self, subject: str, topic: str,
+                                           num_questions: int = 5,
+                                           difficulty: int = 2,
+                                           example_questions: List[Dict] = None) -> List[Dict]:
+        """Async version of generate_practice_questions"""
+        prompt = self._practice_questions_prompt(subject, topic, num_questions,
+                                                 difficulty, example_questions)
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-
-            # Parse the response
-            questions = self._parse_generated_questions(response.text)
-            return questions
+            # Not cached: asking again should give new questions
+            text = await self._agenerate(prompt, _QUESTIONS_CONFIG, use_cache=False)
+            return self._to_questions(text)
 
         except Exception as e:
             print(f"Error generating questions: {e}")
             return []
 
-    def _parse_generated_questions(self, text: str) -> List[Dict]:
-        """Parse generated questions from text"""
-        questions = []
-
-        # Split by question separator
-        parts = text.split('---')
-
-        for part in parts:
-            if 'Question' not in part:
-                continue
-
-            lines = part.strip().split('\n')
-            question_data = {
-                'question': '',
-                'options': [],
-                'answer': '',
-                'explanation': ''
-            }
-
-            current_section = 'question'
-
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                if line.startswith('(A)') or line.startswith('(B)') or \
-                        line.startswith('(C)') or line.startswith('(D)'):
-                    question_data['options'].append(line)
-                    current_section = 'options'
-                elif line.startswith('Correct Answer:'):
-                    question_data['answer'] = line.replace('Correct Answer:', '').strip()
-                    current_section = 'answer'
-                elif line.startswith('Explanation:'):
-                    question_data['explanation'] = line.replace('Explanation:', '').strip()
-                    current_section = 'explanation'
-                elif current_section == 'question' and 'Question' not in line:
-                    question_data['question'] += ' ' + line
-                elif current_section == 'explanation':
-                    question_data['explanation'] += ' ' + line
-
-            if question_data['question'] and question_data['options']:
-                questions.append(question_data)
-
-        return questions
+    async def generate_practice_questions_many(self, topics: List[Tuple[str, str]],
+                                               num_questions: int = 5,
+                                               difficulty: int = 2) -> List[List[Dict]]:
+        """
+        Generate practice questions for several topics concurrently
+
+        Args:
+            topics: (subject, topic) pairs
+            num_questions: Number of questions per topic
+            difficulty: Difficulty level (1-5)
+
+        Returns:
+            One list of questions per topic, in input order
+        """
+        return await asyncio.gather(*(
+            self.agenerate_practice_questions(subject, topic, num_questions, difficulty)
+            for subject, topic in topics
+        ))
+
+    def _practice_questions_prompt(self, subject: str, topic: str,
+                                   num_questions: int, difficulty: int,
+                                   example_questions: List[Dict] = None) -> str:
+        """Build the practice question prompt"""
+        parts = [_QUESTIONS_HEADER.format(subject=subject, topic=topic,
+                                          difficulty=difficulty,
+                                          num_questions=num_questions)]
+
+        if example_questions:
+            parts.append("\nExample questions from previous GATE papers:\n")
+            for idx, eq in enumerate(example_questions[:3], 1):
+                parts.append(f"\n{idx}. {eq.get('question', '')}\n")
+                parts.extend(f"   {opt}\n" for opt in eq.get('options') or [])
+
+        parts.append(_QUESTIONS_FOOTER.format(num_questions=num_questions))
+        return "".join(parts)
+
+    def _to_questions(self, text: str) -> List[Dict]:
+        """Convert a structured question response to question dictionaries"""
+        return [
+            question for question in json.loads(text)
+            if question.get('question') and question.get('options')
+        ]
 
     def build_reading_material(self, subject: str, topic: str,
                                chunks: List[Dict]) -> str:
@@ -262,37 +468,31 @@ Explanation: [Brief explanation]
         Returns:
             Formatted reading material
         """
-        # Combine chunks
-        context = "\n\n".join([chunk.get('text', '') for chunk in chunks[:10]])
+        prompt = self._reading_material_prompt(subject, topic, chunks)
 
-        prompt = f"""You are creating study material for GATE Computer Science preparation.
-
-Subject: {subject}
-Topic: {topic}
-
-Source Material:
-{context}
-
-Create a comprehensive, well-structured study guide that:
-1. Starts with an introduction to the topic
-2. Explains key concepts in a logical sequence
-3. Provides examples and illustrations
-4. Highlights important points for GATE exam
-5. Ends with a summary of key takeaways
+        try:
+            return self._generate(prompt)
+        except Exception as e:
+            print(f"Error building reading material: {e}")
+            return "Error generating reading material. Please try again."
 
-Structure the content with clear headings and subheadings.
-Make it suitable for self-study and revision.
-"""
+    def build_reading_material_stream(self, subject: str, topic: str,
+                                      chunks: List[Dict]) -> Iterator[str]:
+        """Streaming version of build_reading_material, e.g. for st.write_stream"""
+        prompt = self._reading_material_prompt(subject, topic, chunks)
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-            return response.text
+            yield from self._generate_stream(prompt)
         except Exception as e:
             print(f"Error building reading material: {e}")
-            return "Error generating reading material. Please try again."
+            yield "Error generating reading material. Please try again."
+
+    def _reading_material_prompt(self, subject: str, topic: str,
+                                 chunks: List[Dict]) -> str:
+        """Build the reading material prompt"""
+        context = "\n\n".join(chunk.get('text', '') for chunk in chunks[:10])
+        return _READING_MATERIAL_PROMPT.format(subject=subject, topic=topic,
+                                               context=context)
 
     def generate_flashcards(self, subject: str, topic: str,
                             num_cards: int = 10) -> List[Dict]:
@@ -307,70 +507,64 @@ Make it suitable for self-study and revision.
         Returns:
             List of flashcard dictionaries
         """
-        prompt = f"""Create {num_cards} flashcards for GATE Computer Science preparation.
-
-Subject: {subject}
-Topic: {topic}
-
-For each flashcard:
-- Front: A clear, concise question or prompt
-- Back: A detailed answer with key points
+        try:
+            prompt = self._flashcards_prompt(subject, topic, num_cards)
+            text = self._generate(prompt, _FLASHCARDS_CONFIG)
+            return self._to_flashcards(text, subject, topic)
 
-Format:
-Card [N]:
-Front: [Question]
-Back: [Answer]
----
-"""
+        except Exception as e:
+            print(f"Error generating flashcards: {e}")
+            return []
 
+    async def agenerate_flashcards(self, subject: str, topic: str,
+                                   num_cards: int = 10) -> List[Dict]:
+        """Async version of generate_flashcards"""
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-
-            # Parse flashcards
-            flashcards = self._parse_flashcards(response.text, subject, topic)
-            return flashcards
+            prompt = self._flashcards_prompt(subject, topic, num_cards)
+            text = await self._agenerate(prompt, _FLASHCARDS_CONFIG)
+            return self._to_flashcards(text, subject, topic)
 
         except Exception as e:
             print(f"Error generating flashcards: {e}")
             return []
 
-    def _parse_flashcards(self, text: str, subject: str, topic: str) -> List[Dict]:
-        """Parse generated flashcards"""
+    async def generate_flashcards_many(self, topics: List[Tuple[str, str]],
+                                       num_cards: int = 10) -> List[List[Dict]]:
+        """
+        Generate flashcards for several topics concurrently
+
+        Args:
+            topics: (subject, topic) pairs
+            num_cards: Number of flashcards per topic
+
+        Returns:
+            One list of flashcards per topic, in input order
+        """
+        return await asyncio.gather(*(
+            self.agenerate_flashcards(subject, topic, num_cards)
+            for subject, topic in topics
+        ))
+
+    def _flashcards_prompt(self, subject: str, topic: str, num_cards: int) -> str:
+        """Build the flashcard prompt"""
+        return _FLASHCARDS_PROMPT.format(num_cards=num_cards, subject=subject,
+                                         topic=topic)
+
+    def _to_flashcards(self, text: str, subject: str, topic: str) -> List[Dict]:
+        """Convert a structured flashcard response to flashcard dictionaries"""
         flashcards = []
 
-        cards = text.split('---')
-
-        for idx, card in enumerate(cards):
-            if 'Front:' not in card or 'Back:' not in card:
-                continue
-
-            lines = card.strip().split('\n')
-            front = ''
-            back = ''
-            current = None
-
-            for line in lines:
-                if line.strip().startswith('Front:'):
-                    current = 'front'
-                    front = line.replace('Front:', '').strip()
-                elif line.strip().startswith('Back:'):
-                    current = 'back'
-                    back = line.replace('Back:', '').strip()
-                elif current == 'front':
-                    front += ' ' + line.strip()
-                elif current == 'back':
-                    back += ' ' + line.strip()
+        for idx, card in enumerate(json.loads(text)):
+            front = card.get('front', '').strip()
+            back = card.get('back', '').strip()
 
             if front and back:
                 flashcards.append({
                     'id': f"{subject}_{topic}_{idx}",
                     'subject': subject,
                     'topic': topic,
-                    'front': front.strip(),
-                    'back': back.strip()
+                    'front': front,
+                    'back': back
                 })
 
         return flashcards
@@ -0,0 +1,93 @@
+"""
+Content-addressed on-disk cache for LLM responses
+"""
+
+from pathlib import Path
+from typing import Optional
+import hashlib
+import sqlite3
+import threading
+import time
+
+# Cached responses expire after 30 days
+_DEFAULT_TTL = 30 * 86400
+
+
+class ResponseCache:
+    """Cache generated text in SQLite, keyed by a hash of model name, config and prompt"""
+
+    def __init__(self, path: str, namespace: str, ttl: float = _DEFAULT_TTL):
+        """
+        Open (or create) the cache
+
+        Args:
+            path: SQLite database file
+            namespace: Prefix mixed into every key, e.g. the model name,
+                so different models never share entries
+            ttl: Seconds a stored response stays valid
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.namespace = namespace
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key BLOB PRIMARY KEY,
+                response TEXT NOT NULL,
+                expires REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+    def key(self, prompt: str, config: str = "") -> bytes:
+        """
+        Compute the cache key for a prompt
+
+        Args:
+            prompt: Full prompt text
+            config: Serialized generation config (e.g. response MIME type
+                and schema), so the same prompt under different output
+                formats never shares an entry; empty for plain text
+
+        Returns:
+            32-byte SHA-256 digest
+        """
+        data = f"{self.namespace}\0{config}\0{prompt}" if config else f"{self.namespace}\0{prompt}"
+        return hashlib.sha256(data.encode('utf-8')).digest()
+
+    def get(self, key: bytes) -> Optional[str]:
+        """
+        Look up a response
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached response, or None if missing or expired
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND expires > ?",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: bytes, response: str):
+        """
+        Store a response
+
+        Args:
+            key: Cache key
+            response: Generated text
+        """
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, expires) VALUES (?, ?, ?)",
+                (key, response, time.time() + self.ttl)
+            )
+
+    def close(self):
+        """Close the underlying database"""
+        self.conn.close()
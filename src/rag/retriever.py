@@ -2,53 +2,217 @@
 Hybrid retriever combining vector similarity and graph traversal
 """
 
-from typing import List, Dict, Optional
-import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+import hashlib
 
-sys.path.append('../..')
+import numpy as np
 
+from config.config import config
 from src.graph.neo4j_client import Neo4jClient
 from src.ingestion.embeddings_generator import EmbeddingsGenerator
+from src.rag.query_cache import QueryCache
+
+# ============= Cypher Queries =============
+
+_QUESTIONS_BY_DIFFICULTY_CYPHER = """
+        MATCH (t:Topic {name: $topic, subject: $subject})-[:HAS_QUESTION]->(q:Question)
+        RETURN q.text AS question,
+               q.options AS options,
+               q.answer AS answer,
+               q.difficulty AS difficulty,
+               q.year AS year,
+               q.marks AS marks
+        ORDER BY q.difficulty %s, q.year DESC, q.text
+"""
+
+# One fixed text per direction, so each is parsed and planned only once
+_QUESTIONS_EASY_FIRST_CYPHER = _QUESTIONS_BY_DIFFICULTY_CYPHER % "ASC"
+_QUESTIONS_HARD_FIRST_CYPHER = _QUESTIONS_BY_DIFFICULTY_CYPHER % "DESC"
+
+# Appended for one page of either ordering; q.text above keeps pages stable
+_QUESTIONS_PAGE_CYPHER = """
+        SKIP $skip
+        LIMIT $limit
+"""
 
 
 class HybridRetriever:
     """Hybrid retriever combining vector similarity and graph traversal"""
 
-    def __init__(self, neo4j_client: Neo4jClient):
+    def __init__(self, neo4j_client: Neo4jClient,
+                 use_parallel_runtime: bool = config.NEO4J_PARALLEL_RUNTIME):
         """
         Initialize retriever
 
         Args:
             neo4j_client: Neo4j client instance
+            use_parallel_runtime: Run read-only graph aggregations on the
+                parallel runtime (Neo4j Enterprise 5.13+), which spreads
+                them over all server cores
         """
         self.client = neo4j_client
+        self.use_parallel_runtime = use_parallel_runtime
         self.embedder = EmbeddingsGenerator()
 
+        # Query embeddings only depend on the model, so they live longer
+        # than search results, which change when the graph does
+        self._embed_cache = QueryCache(max_size=1024, ttl_seconds=3600)
+        self._result_cache = QueryCache(max_size=256, ttl_seconds=300)
+
+        # Subjects and topics only change on ingestion, but menus re-read
+        # them on every page render
+        self._catalog_cache = QueryCache(max_size=32, ttl_seconds=60)
+
+        # Independent searches run side by side; the driver is thread-safe
+        self._pool = ThreadPoolExecutor(max_workers=4)
+
+    def close(self):
+        """Shut down the search thread pool"""
+        self._pool.shutdown(wait=False)
+
+    def _cypher(self, query: str) -> str:
+        """
+        Select the parallel runtime for a read-only query if enabled
+
+        Only for queries without writes or procedure calls such as
+        db.index.vector.queryNodes, which the parallel runtime rejects.
+        """
+        if self.use_parallel_runtime:
+            return "CYPHER runtime=parallel\n" + query
+        return query
+
+    def invalidate(self):
+        """Drop cached search results and catalog, e.g. after loading new data"""
+        self._result_cache.invalidate()
+        self.invalidate_catalog()
+
+    def invalidate_catalog(self):
+        """Drop cached subject and topic lists, e.g. after ingestion"""
+        self._catalog_cache.invalidate()
+
     # ============= Vector Similarity Search =============
 
-    def vector_search(self, query: str, top_k: int = 5,
-                      subject: str = None, topic: str = None) -> List[Dict]:
+    def vector_search(self, query: str = None, top_k: int = 5,
+                      subject: str = None, topic: str = None,
+                      expand_factor: int = 4,
+                      query_embedding: np.ndarray = None) -> List[Dict]:
         """
         Perform vector similarity search on chunks
 
         Args:
-            query: Search query
+            query: Search query; may be omitted if query_embedding is given
             top_k: Number of results to return
             subject: Optional subject filter
             topic: Optional topic filter
+            expand_factor: With filters, fetch top_k * expand_factor
+                nearest chunks before filtering, so filtering still leaves
+                top_k results
+            query_embedding: Precomputed embedding of the query, used
+                instead of embedding query again
 
         Returns:
             List of relevant chunks with scores
         """
-        # Generate query embedding
-        query_embedding = self.embedder.generate_embedding(query)
+        if query_embedding is not None:
+            return self.vector_search_batch(None, top_k, subject, topic, expand_factor,
+                                            query_embeddings=[query_embedding])[0]
+        return self.vector_search_batch([query], top_k, subject, topic,
+                                        expand_factor)[0]
+
+    def vector_search_batch(self, queries: Optional[List[str]], top_k: int = 5,
+                            subject: str = None, topic: str = None,
+                            expand_factor: int = 4,
+                            query_embeddings: List[np.ndarray] = None) -> List[List[Dict]]:
+        """
+        Perform vector similarity search for several queries at once
+
+        Queries missing from the result cache are embedded in one model
+        pass and searched in one Cypher call.
+
+        Args:
+            queries: Search queries; may be None if query_embeddings is given
+            top_k: Number of results to return per query
+            subject: Optional subject filter
+            topic: Optional topic filter
+            expand_factor: Over-fetch factor applied when filtering, see
+                vector_search
+            query_embeddings: Precomputed query embeddings, used instead
+                of embedding queries
+
+        Returns:
+            One list of relevant chunks with scores per query, in input order
+        """
+        if queries is None and query_embeddings is None:
+            raise ValueError("Either queries or query_embeddings is required")
+
+        # The index returns nearest chunks before the topic filter runs
+        candidates = top_k * expand_factor if subject or topic else top_k
+
+        if query_embeddings is not None:
+            keys = [hashlib.blake2b(np.asarray(embedding, dtype=np.float32).tobytes(),
+                                    digest_size=16).digest()
+                    for embedding in query_embeddings]
+        else:
+            keys = [hashlib.blake2b(query.encode('utf-8'), digest_size=16).digest()
+                    for query in queries]
+        results = [self._result_cache.get((key, top_k, candidates, subject, topic))
+                   for key in keys]
+
+        pending = [idx for idx, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        if query_embeddings is not None:
+            pending_embeddings = [query_embeddings[idx] for idx in pending]
+        else:
+            pending_embeddings = self._embed_queries([queries[idx] for idx in pending],
+                                                     [keys[idx] for idx in pending])
+
+        try:
+            records = self.client.run_query(self._vector_search_cypher(subject, topic), {
+                'query_embeddings': pending_embeddings,
+                'top_k': top_k,
+                'candidates': candidates,
+                'subject': subject,
+                'topic': topic
+            })
+        except Exception as e:
+            print(f"Vector search error: {e}")
+            return [result if result is not None else [] for result in results]
+
+        hits_by_slot = {record['i']: record['hits'] for record in records}
+        for slot, idx in enumerate(pending):
+            results[idx] = hits_by_slot.get(slot, [])
+            self._result_cache.set((keys[idx], top_k, candidates, subject, topic),
+                                   results[idx])
+
+        return results
+
+    def _embed_queries(self, queries: List[str], keys: List[bytes]) -> List:
+        """Embed queries, reusing cached embeddings and encoding the rest together"""
+        embeddings = [self._embed_cache.get(key) for key in keys]
+        missing = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
+
+        if missing:
+            generated = self.embedder.generate_embeddings_batch(
+                [queries[idx] for idx in missing], show_progress=False
+            )
+            for idx, embedding in zip(missing, generated):
+                embeddings[idx] = embedding
+                self._embed_cache.set(keys[idx], embedding)
 
-        # Build Cypher query
+        return embeddings
+
+    @staticmethod
+    def _vector_search_cypher(subject: str = None, topic: str = None) -> str:
+        """Build the batched vector search query for the given filters"""
         cypher = """
+        UNWIND range(0, size($query_embeddings) - 1) AS i
         CALL db.index.vector.queryNodes(
-            'chunk_embeddings', 
-            $top_k, 
-            $query_embedding
+            'chunk_embeddings',
+            $candidates,
+            $query_embeddings[i]
         ) YIELD node AS chunk, score
         """
 
@@ -65,26 +229,20 @@ class HybridRetriever:
             if filters:
                 cypher += "\nWHERE " + " AND ".join(filters)
 
+        # Top results per query, best first
         cypher += """
-        RETURN chunk.text AS text,
-               chunk.source_file AS source,
-               chunk.page_number AS page,
-               score
+        WITH i, chunk, score
         ORDER BY score DESC
-        LIMIT $top_k
+        WITH i, collect({
+            text: chunk.text,
+            source: chunk.source_file,
+            page: chunk.page_number,
+            score: score
+        })[..$top_k] AS hits
+        RETURN i, hits
         """
 
-        try:
-            results = self.client.run_query(cypher, {
-                'query_embedding': query_embedding,
-                'top_k': top_k,
-                'subject': subject,
-                'topic': topic
-            })
-            return results
-        except Exception as e:
-            print(f"Vector search error: {e}")
-            return []
+        return cypher
 
     # ============= Graph Traversal Search =============
 
@@ -101,32 +259,52 @@ class HybridRetriever:
         Returns:
             Dictionary with topic information
         """
-        cypher = """
-        MATCH (s:Subject {name: $subject})-[:HAS_TOPIC]->(t:Topic {name: $topic})
-        OPTIONAL MATCH (t)-[:EXPLAINED_BY]->(chunk:Chunk)
-        OPTIONAL MATCH (t)-[:HAS_QUESTION]->(q:Question)
+        return self.graph_search_many(subject, [topic], include_concepts).get(topic, {})
+
+    def graph_search_many(self, subject: str, topics: List[str],
+                          include_concepts: bool = True) -> Dict[str, Dict]:
         """
+        Retrieve graph information for several topics in one query
 
-        if include_concepts:
-            cypher += "\nOPTIONAL MATCH (t)-[:HAS_CONCEPT]->(c:Concept)"
+        Args:
+            subject: Subject name
+            topics: Topic names
+            include_concepts: Include related concepts
 
-        cypher += """
+        Returns:
+            Dictionary mapping each topic found to its information, as
+            returned by graph_search
+        """
+        # Subqueries stop after 5 chunk texts and count questions without
+        # reading them, instead of collecting every chunk x question row
+        cypher = """
+        UNWIND $topics AS topic_name
+        MATCH (s:Subject {name: $subject})-[:HAS_TOPIC]->(t:Topic {name: topic_name})
         RETURN t.name AS topic,
                t.description AS description,
                t.difficulty_level AS difficulty,
-               collect(DISTINCT chunk.text)[0..5] AS sample_chunks,
-               count(DISTINCT q) AS question_count
+               COLLECT {
+                   MATCH (t)-[:EXPLAINED_BY]->(chunk:Chunk)
+                   RETURN DISTINCT chunk.text
+                   LIMIT 5
+               } AS sample_chunks,
+               COUNT { (t)-[:HAS_QUESTION]->(:Question) } AS question_count
         """
 
         if include_concepts:
-            cypher += ", collect(DISTINCT c.name) AS concepts"
+            cypher += """,
+               COLLECT {
+                   MATCH (t)-[:HAS_CONCEPT]->(c:Concept)
+                   RETURN DISTINCT c.name
+               } AS concepts
+        """
 
         try:
-            results = self.client.run_query(cypher, {
+            results = self.client.run_query(self._cypher(cypher), {
                 'subject': subject,
-                'topic': topic
+                'topics': list(dict.fromkeys(topics))
             })
-            return results[0] if results else {}
+            return {result['topic']: result for result in results}
         except Exception as e:
             print(f"Graph search error: {e}")
             return {}
@@ -134,7 +312,8 @@ class HybridRetriever:
     # ============= Hybrid Search =============
 
     def hybrid_search(self, query: str, subject: str, topic: str,
-                      top_k: int = 5) -> Dict:
+                      top_k: int = 5,
+                      query_embedding: np.ndarray = None) -> Dict:
         """
         Combine vector search and graph traversal
 
@@ -143,15 +322,17 @@ class HybridRetriever:
             subject: Subject name
             topic: Topic name
             top_k: Number of vector results
+            query_embedding: Precomputed embedding of query, if the caller
+                already has one
 
         Returns:
             Combined results
         """
-        # Get vector search results
-        vector_results = self.vector_search(query, top_k, subject, topic)
-
-        # Get graph traversal results
-        graph_results = self.graph_search(subject, topic)
+        # Run vector search and graph traversal concurrently
+        vector_future = self._pool.submit(self.vector_search, query, top_k, subject, topic,
+                                         query_embedding=query_embedding)
+        graph_future = self._pool.submit(self.graph_search, subject, topic)
+        vector_results, graph_results = vector_future.result(), graph_future.result()
 
         # Combine results
         combined = {
@@ -167,20 +348,82 @@ class HybridRetriever:
     def get_questions_by_topic(self, subject: str, topic: str,
                                year: int = None,
                                difficulty: int = None,
-                               limit: int = 10) -> List[Dict]:
+                               limit: int = 10,
+                               after_year: int = None,
+                               after_difficulty: int = None,
+                               after_text: str = None) -> List[Dict]:
         """
         Retrieve questions for a specific topic
 
+        Results are ordered newest year first, then easiest first, then by
+        question text, which makes the order total. To page through them,
+        pass the year, difficulty and text of the last question of the
+        previous page as after_year, after_difficulty and after_text; the
+        cursor is applied in WHERE, so no earlier rows are re-read and
+        questions sharing a year and difficulty are not skipped.
+
         Args:
             subject: Subject name
             topic: Topic name
             year: Optional year filter
             difficulty: Optional difficulty filter
             limit: Maximum number of questions
+            after_year: Year of the last question already seen
+            after_difficulty: Difficulty of the last question already seen
+            after_text: Text of the last question already seen
 
         Returns:
             List of questions
+
+        Raises:
+            ValueError: If only part of the cursor is given
         """
+        cypher, params = self._questions_by_topic_query(
+            subject, topic, year, difficulty, limit,
+            after_year, after_difficulty, after_text
+        )
+
+        try:
+            results = self.client.run_query(cypher, params)
+            return results
+        except Exception as e:
+            print(f"Question retrieval error: {e}")
+            return []
+
+    def iter_questions_by_topic(self, subject: str, topic: str,
+                                year: int = None,
+                                difficulty: int = None,
+                                limit: int = 10,
+                                after_year: int = None,
+                                after_difficulty: int = None,
+                                after_text: str = None) -> Iterator[Dict]:
+        """
+        Stream questions for a specific topic as Neo4j returns them
+
+        Same arguments and order as get_questions_by_topic, but rows are
+        yielded one at a time instead of being collected into a list
+        first, which suits large limits.
+
+        Yields:
+            One question dictionary per row
+        """
+        cypher, params = self._questions_by_topic_query(
+            subject, topic, year, difficulty, limit,
+            after_year, after_difficulty, after_text
+        )
+
+        try:
+            yield from self.client.stream_query(cypher, params)
+        except Exception as e:
+            print(f"Question retrieval error: {e}")
+
+    @staticmethod
+    def _questions_by_topic_query(subject: str, topic: str, year: Optional[int],
+                                  difficulty: Optional[int], limit: int,
+                                  after_year: Optional[int],
+                                  after_difficulty: Optional[int],
+                                  after_text: Optional[str]) -> Tuple[str, Dict]:
+        """Build the question query and parameters for the given filters"""
         cypher = """
         MATCH (t:Topic {name: $topic, subject: $subject})-[:HAS_QUESTION]->(q:Question)
         """
@@ -200,6 +443,24 @@ class HybridRetriever:
             where_clauses.append("q.difficulty = $difficulty")
             params['difficulty'] = difficulty
 
+        # Rows strictly after the cursor in ORDER BY order below; a partial
+        # cursor would otherwise be dropped and return the first page again
+        cursor = (after_year, after_difficulty, after_text)
+        if any(value is not None for value in cursor) and None in cursor:
+            raise ValueError(
+                "after_year, after_difficulty and after_text must be given together"
+            )
+        if after_year is not None:
+            where_clauses.append(
+                "(q.year < $after_year OR "
+                "(q.year = $after_year AND q.difficulty > $after_difficulty) OR "
+                "(q.year = $after_year AND q.difficulty = $after_difficulty "
+                "AND q.text > $after_text))"
+            )
+            params['after_year'] = after_year
+            params['after_difficulty'] = after_difficulty
+            params['after_text'] = after_text
+
         if where_clauses:
             cypher += "\nWHERE " + " AND ".join(where_clauses)
 
@@ -211,19 +472,16 @@ class HybridRetriever:
                q.difficulty AS difficulty,
                q.marks AS marks,
                q.paper_set AS paper_set
-        ORDER BY q.year DESC, q.difficulty ASC
+        ORDER BY q.year DESC, q.difficulty ASC, q.text ASC
         LIMIT $limit
         """
 
-        try:
-            results = self.client.run_query(cypher, params)
-            return results
-        except Exception as e:
-            print(f"Question retrieval error: {e}")
-            return []
+        return cypher, params
 
     def get_questions_ordered_by_difficulty(self, subject: str, topic: str,
-                                            ascending: bool = True) -> List[Dict]:
+                                            ascending: bool = True,
+                                            skip: int = 0,
+                                            limit: int = None) -> List[Dict]:
         """
         Get questions ordered by difficulty for Learn mode
 
@@ -231,27 +489,23 @@ class HybridRetriever:
             subject: Subject name
             topic: Topic name
             ascending: If True, easy to hard; if False, hard to easy
+            skip: Number of questions to skip, when loading page by page
+            limit: Maximum number of questions; None returns all of them
 
         Returns:
             Ordered list of questions
         """
-        order = "ASC" if ascending else "DESC"
-
-        cypher = f"""
-        MATCH (t:Topic {{name: $topic, subject: $subject}})-[:HAS_QUESTION]->(q:Question)
-        RETURN q.text AS question,
-               q.options AS options,
-               q.answer AS answer,
-               q.difficulty AS difficulty,
-               q.year AS year,
-               q.marks AS marks
-        ORDER BY q.difficulty {order}, q.year DESC
-        """
+        cypher = (_QUESTIONS_EASY_FIRST_CYPHER if ascending
+                  else _QUESTIONS_HARD_FIRST_CYPHER)
+        if limit is not None:
+            cypher += _QUESTIONS_PAGE_CYPHER
 
         try:
             results = self.client.run_query(cypher, {
                 'subject': subject,
-                'topic': topic
+                'topic': topic,
+                'skip': skip,
+                'limit': limit
             })
             return results
         except Exception as e:
@@ -260,22 +514,30 @@ class HybridRetriever:
 
     def get_all_subjects(self) -> List[str]:
         """Get list of all subjects"""
-        query = "MATCH (s:Subject) RETURN s.name AS name ORDER BY name"
-        results = self.client.run_query(query)
-        return [r['name'] for r in results]
+        subjects = self._catalog_cache.get('subjects')
+        if subjects is None:
+            query = "MATCH (s:Subject) RETURN s.name AS name ORDER BY name"
+            results = self.client.run_query(self._cypher(query))
+            subjects = [r['name'] for r in results]
+            self._catalog_cache.set('subjects', subjects)
+        return subjects
 
     def get_topics_for_subject(self, subject: str) -> List[Dict]:
         """Get list of topics for a subject with metadata"""
+        results = self._catalog_cache.get(('topics', subject))
+        if results is not None:
+            return results
+
         query = """
         MATCH (s:Subject {name: $subject})-[:HAS_TOPIC]->(t:Topic)
-        OPTIONAL MATCH (t)-[:HAS_QUESTION]->(q:Question)
         RETURN t.name AS name,
                t.description AS description,
                t.difficulty_level AS difficulty,
-               count(DISTINCT q) AS question_count
+               coalesce(t.question_count, 0) AS question_count
         ORDER BY t.name
         """
-        results = self.client.run_query(query, {'subject': subject})
+        results = self.client.run_query(self._cypher(query), {'subject': subject})
+        self._catalog_cache.set(('topics', subject), results)
         return results
 
 
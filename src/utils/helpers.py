@@ -2,10 +2,27 @@
 Utility helper functions
 """
 
+import os
 import re
 from typing import List, Dict
 from pathlib import Path
 
+# Runs of whitespace and anything but alphanumerics and basic punctuation;
+# whitespace is not in the kept set, so one pass both strips special
+# characters and collapses spacing
+_CLEAN_RE = re.compile(r'[^\w.,!?;:()\-\'\"]+')
+
+# The same class for pyarrow's RE2 engine, whose \w only matches ASCII.
+# Python's Unicode \w is letters, numbers and underscore; combining marks
+# (\p{M}) are not word characters there, so they are not kept here either
+_CLEAN_RE2 = r'[^\p{L}\p{N}_.,!?;:()\-\'"]+'
+
+# 4-digit year, e.g. "gate2023_set1.pdf"
+_YEAR_RE = re.compile(r'(20\d{2})')
+
+# "set" followed by a number or letter
+_SET_RE = re.compile(r'set[_\-\s]*([0-9A-Za-z]+)', re.IGNORECASE)
+
 
 def clean_text(text: str) -> str:
     """
@@ -20,13 +37,31 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
 
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    # Replace special characters and whitespace runs with a single space
+    # (keep alphanumeric and basic punctuation)
+    return _CLEAN_RE.sub(' ', text).strip()
+
+
+def clean_text_batch(texts: List[str]) -> List[str]:
+    """
+    Clean and normalize many texts at once
+
+    Same result as clean_text for each text, non-ASCII input included,
+    but the regex runs inside pyarrow over one Arrow string array instead
+    of once per Python call. Text with combining marks (e.g. Devanagari
+    vowel signs) is split at the marks, as clean_text does.
+
+    Args:
+        texts: Input texts; None and empty strings give ""
 
-    # Remove special characters (keep alphanumeric, spaces, and basic punctuation)
-    text = re.sub(r'[^\w\s.,!?;:()\-\'\"]+', '', text)
+    Returns:
+        Cleaned texts, in input order
+    """
+    # pandas is only needed here, so keep it out of the module import
+    import pandas as pd
 
-    return text.strip()
+    series = pd.Series(texts, dtype="string[pyarrow]").fillna("")
+    return series.str.replace(_CLEAN_RE2, " ", regex=True).str.strip().tolist()
 
 
 def extract_year_from_filename(filename: str) -> int:
@@ -40,7 +75,7 @@ def extract_year_from_filename(filename: str) -> int:
         Year as integer, or 0 if not found
     """
     # Look for 4-digit year pattern
-    match = re.search(r'(20\d{2})', filename)
+    match = _YEAR_RE.search(filename)
     if match:
         return int(match.group(1))
     return 0
@@ -57,7 +92,7 @@ def extract_set_from_filename(filename: str) -> str:
         Set identifier (e.g., "Set-1")
     """
     # Look for "set" followed by number or letter
-    match = re.search(r'set[_\-\s]*([0-9A-Za-z]+)', filename, re.IGNORECASE)
+    match = _SET_RE.search(filename)
     if match:
         return f"Set-{match.group(1)}"
     return "Unknown"
@@ -105,7 +140,6 @@ def get_file_size_mb(filepath: str) -> float:
         File size in MB
     """
     try:
-        size_bytes = Path(filepath).stat().st_size
-        return size_bytes / (1024 * 1024)
-    except:
+        return os.path.getsize(filepath) / (1024 * 1024)
+    except OSError:
         return 0.0
@@ -1,18 +1,15 @@
-from neo4j import GraphDatabase
 from google import genai
 from config.config import config
+from src.graph.neo4j_client import get_client
+import importlib.util
 import sys
 
 
 def test_neo4j():
+    """Verify connectivity through the shared client, leaving its pool warm"""
     try:
-        driver = GraphDatabase.driver(
-            config.NEO4J_URI,
-            auth=(config.NEO4J_USERNAME, config.NEO4J_PASSWORD)
-        )
-        driver.verify_connectivity()
+        get_client().driver.verify_connectivity()
         print("✅ Neo4j: Connected successfully")
-        driver.close()
         return True
     except Exception as e:
         print(f"❌ Neo4j: Connection failed - {e}")
@@ -35,7 +32,13 @@ def test_gemini():
         return False
 
 
-def test_packages():
+def test_packages(deep: bool = False):
+    """
+    Check that required packages are installed
+
+    By default only looks each package up on sys.path, without running
+    its (often slow) import; deep=True imports them as well.
+    """
     packages = [
         'neo4j', 'streamlit', 'pymupdf', 'langchain',
         'sentence_transformers', 'fsrs', 'pandas'
@@ -44,7 +47,10 @@ def test_packages():
     all_ok = True
     for package in packages:
         try:
-            __import__(package)
+            if deep:
+                __import__(package)
+            elif importlib.util.find_spec(package) is None:
+                raise ImportError(package)
             print(f"✅ {package}: Installed")
         except ImportError:
             print(f"❌ {package}: Not installed")
@@ -59,7 +65,7 @@ if __name__ == "__main__":
     print("=" * 60)
 
     print("\n1. Testing Package Installation:")
-    packages_ok = test_packages()
+    packages_ok = test_packages(deep="--deep" in sys.argv)
 
     print("\n2. Testing Neo4j Connection:")
     neo4j_ok = test_neo4j()
@@ -0,0 +1,36 @@
+"""
+Tests for text cleaning helpers
+"""
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from src.utils.helpers import clean_text, clean_text_batch
+
+
+# Non-ASCII letters, Devanagari vowel signs (combining marks), CJK,
+# superscripts and Arabic-Indic digits, plus the ASCII cases
+_SAMPLES = [
+    "हिन्दी में प्रश्न",
+    "café au lait",
+    "naïve",
+    "nai\u0308ve",
+    "Ünïcödé 123",
+    "数据结构 & 算法",
+    "x² + ½ = ٣",
+    "  What is   a (binary) tree?\n\t",
+    "snake_case, 'quoted' \"text\" -- done!",
+    "",
+]
+
+
+def test_clean_text_batch_matches_clean_text():
+    """The pyarrow batch path gives the same result as the per-text regex"""
+    assert clean_text_batch(_SAMPLES) == [clean_text(text) for text in _SAMPLES]
+
+
+def test_clean_text_batch_none():
+    """None is cleaned to an empty string"""
+    assert clean_text_batch([None, "a"]) == ["", "a"]
@@ -3,18 +3,27 @@ Streamlit UI for GATE CS 2026 Preparation System
 """
 
 import streamlit as st
-from typing import Dict, List
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List
 import sys
+import threading
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
+# Add the project root to Python path once; Streamlit re-executes this
+# script on every interaction, so an unguarded append would grow sys.path
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
-from src.graph.neo4j_client import Neo4jClient
-from src.rag.retriever import HybridRetriever
-from src.rag.answer_generator import AnswerGenerator
-from src.learning.progress_tracker import ProgressTracker
-from src.learning.spaced_repetition import SpacedRepetitionManager
+from src.graph.neo4j_client import get_client
+
+# The components pull in torch, sentence-transformers and the Gemini SDK,
+# so they are imported by the factories below on first use instead
+if TYPE_CHECKING:
+    from src.rag.retriever import HybridRetriever
+    from src.rag.answer_generator import AnswerGenerator
+    from src.learning.progress_tracker import ProgressTracker
 
 # Page configuration
 st.set_page_config(
@@ -24,79 +33,157 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1f77b4;
-        text-align: center;
-        padding: 1rem 0;
-        margin-bottom: 2rem;
-    }
-    .question-card {
-        background-color: #ffffff;
-        border: 2px solid #e0e0e0;
-        border-radius: 10px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    .success-box {
-        background-color: #d4edda;
-        border: 1px solid #c3e6cb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    .error-box {
-        background-color: #f8d7da;
-        border: 1px solid #f5c6cb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    .info-box {
-        background-color: #d1ecf1;
-        border: 1px solid #bee5eb;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    .metric-card {
-        background-color: #f8f9fa;
-        border-radius: 10px;
-        padding: 1rem;
-        text-align: center;
-    }
-</style>
-""", unsafe_allow_html=True)
+
+# Streamlit re-runs this module on every rerun, so caches that must
+# outlive a run live in st.cache_resource rather than at module level
+@st.cache_resource(max_entries=16)
+def _stars(difficulty: int) -> str:
+    """Star rating for a difficulty level, at least one star"""
+    return '⭐' * max(1, difficulty)
+
+
+# Cached lookups; the leading underscore keeps Streamlit from hashing
+# the retriever or tracker argument
+@st.cache_data(ttl=3600)
+def _cached_subjects(_retriever: "HybridRetriever") -> List[str]:
+    """Subjects, re-read from Neo4j at most once an hour"""
+    return _retriever.get_all_subjects()
+
+
+@st.cache_data(ttl=3600)
+def _cached_topics(_retriever: "HybridRetriever", subject: str) -> List[Dict]:
+    """Topics of a subject, re-read from Neo4j at most once an hour"""
+    return _retriever.get_topics_for_subject(subject)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_practice_questions(subject: str, topic: str, num_questions: int,
+                               difficulty: int) -> List[Dict]:
+    """
+    Generated practice questions; concurrent identical calls run once
+
+    The generator reports API errors by returning no questions. That is
+    raised here instead, because st.cache_data does not cache exceptions,
+    so a transient failure is retried on the next press.
+    """
+    # Get example questions
+    pyqs = get_retriever().get_questions_by_topic(subject, topic, limit=5)
+
+    questions = get_answer_generator().generate_practice_questions(
+        subject=subject,
+        topic=topic,
+        num_questions=num_questions,
+        difficulty=difficulty,
+        example_questions=pyqs
+    )
+    if not questions:
+        raise RuntimeError("no questions were generated, please try again")
+    return questions
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_chunk_count() -> int:
+    """Number of textbook chunks, used to notice that new data was loaded"""
+    return get_client().get_node_count('Chunk')
+
+
+@st.cache_data(ttl=24 * 60 * 60, show_spinner=False)
+def _cached_reading_chunks(subject: str, topic: str, data_version: int) -> List[Dict]:
+    """
+    Source chunks for a topic's reading material, kept for a day
+
+    data_version is the chunk count, so loading textbooks starts a fresh
+    entry. No chunks is raised as LookupError rather than returned, since
+    st.cache_data does not cache exceptions and the material can appear
+    once the data is loaded.
+    """
+    chunks = get_retriever().vector_search(
+        query=f"comprehensive explanation of {topic}",
+        subject=subject,
+        topic=topic,
+        top_k=10
+    )
+    if not chunks:
+        raise LookupError(f"no chunks for {subject} - {topic}")
+    return chunks
+
+
+@st.cache_data(ttl=60)
+def _cached_user_stats(_tracker: "ProgressTracker", subject: str, topic: str) -> Dict:
+    """Progress stats, kept short-lived and cleared when an attempt is recorded"""
+    return _tracker.get_user_stats(subject, topic)
+
+
+# Questions loaded per round trip in Learn mode
+_LEARN_PAGE_SIZE = 20
+
+@st.cache_resource
+def _get_executor() -> ThreadPoolExecutor:
+    """Pool running independent lookups side by side; shared by all sessions"""
+    return ThreadPoolExecutor(max_workers=4)
+
+
+def _submit(fn: Callable, *args) -> Future:
+    """Run fn(*args) on the sidebar pool, attached to the current script run"""
+    ctx = get_script_run_ctx()
+
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+
+    return _get_executor().submit(run)
+
+
+# Shared resources, built once per process and used by every session
+@st.cache_resource
+def get_retriever() -> "HybridRetriever":
+    """Retriever, holding the embedding model and the shared Neo4j client"""
+    from src.rag.retriever import HybridRetriever
+    return HybridRetriever(get_client())
+
+
+@st.cache_resource
+def get_answer_generator() -> "AnswerGenerator":
+    """Gemini answer generator"""
+    from src.rag.answer_generator import AnswerGenerator
+    return AnswerGenerator()
+
+
+@st.cache_resource
+def get_progress_tracker() -> "ProgressTracker":
+    """Progress tracker on the shared Neo4j client"""
+    from src.learning.progress_tracker import ProgressTracker
+    return ProgressTracker(get_client())
 
 
 # Initialize session state
 def init_session_state():
     """Initialize session state variables"""
-    if 'initialized' not in st.session_state:
-        try:
-            st.session_state.neo4j_client = Neo4jClient()
-            st.session_state.retriever = HybridRetriever(st.session_state.neo4j_client)
-            st.session_state.answer_gen = AnswerGenerator()
-            st.session_state.progress_tracker = ProgressTracker(st.session_state.neo4j_client)
+    try:
+        get_retriever()
+        get_answer_generator()
+        get_progress_tracker()
+        # The flashcard store's SQLite connection is not shared across
+        # sessions, so it stays per session
+        if 'sr_manager' not in st.session_state:
+            from src.learning.spaced_repetition import SpacedRepetitionManager
             st.session_state.sr_manager = SpacedRepetitionManager()
-            st.session_state.initialized = True
-        except Exception as e:
-            st.error(f"Initialization error: {e}")
-            st.stop()
+    except Exception as e:
+        st.error(f"Initialization error: {e}")
+        st.stop()
 
     if 'current_question_index' not in st.session_state:
         st.session_state.current_question_index = 0
     if 'questions_list' not in st.session_state:
         st.session_state.questions_list = []
+    if 'questions_exhausted' not in st.session_state:
+        st.session_state.questions_exhausted = False
     if 'user_answers' not in st.session_state:
         st.session_state.user_answers = {}
-    if 'show_explanation' not in st.session_state:
-        st.session_state.show_explanation = False
+    if 'correct_count' not in st.session_state:
+        st.session_state.correct_count = 0
+    if 'context_futures' not in st.session_state:
+        st.session_state.context_futures = {}
 
 
 # Helper functions
@@ -104,25 +191,90 @@ def reset_session():
     """Reset session variables"""
     st.session_state.current_question_index = 0
     st.session_state.questions_list = []
+    st.session_state.questions_exhausted = False
     st.session_state.user_answers = {}
-    st.session_state.show_explanation = False
+    st.session_state.correct_count = 0
+    st.session_state.context_futures = {}
+
+
+def prefetch_contexts(subject: str, topic: str, questions: List[Dict]):
+    """
+    Start fetching explanation contexts for questions in the background
+
+    One batched vector search covers every question not already being
+    fetched, and runs while the user reads the current question. Futures
+    are kept in session_state keyed by question text; ones for questions
+    outside the current window are dropped.
+
+    Args:
+        subject: Subject name
+        topic: Topic name
+        questions: Current question and the next few
+    """
+    texts = [q['question'] for q in questions]
+    futures = {text: entry for text, entry in st.session_state.context_futures.items()
+               if text in texts}
+
+    pending = [text for text in texts if text not in futures]
+    if pending:
+        future = _get_executor().submit(get_retriever().vector_search_batch,
+                                  pending, 3, subject, topic)
+        for i, text in enumerate(pending):
+            futures[text] = (future, i)
+
+    st.session_state.context_futures = futures
+
+
+def get_context(subject: str, topic: str, question_text: str) -> List[Dict]:
+    """
+    Explanation context for a question, from its prefetch if there is one
+
+    vector_search_batch reports Neo4j errors as empty results, so an empty
+    prefetch is retried with a direct search just like a failed one.
+    """
+    entry = st.session_state.context_futures.get(question_text)
+    if entry is not None:
+        future, i = entry
+        try:
+            context = future.result()[i]
+            if context:
+                return context
+        except Exception:
+            pass  # Fall back to a direct search below
+    return get_retriever().vector_search(
+        question_text, subject=subject, topic=topic, top_k=3
+    )
 
 
 # Main application
 def main():
-    init_session_state()
+    # Header first, so it shows while the components load on a cold start
+    st.title("🎓 GATE CS 2026 Preparation System")
 
-    # Header
-    st.markdown('<div class="main-header">🎓 GATE CS 2026 Preparation System</div>',
-                unsafe_allow_html=True)
+    init_session_state()
 
     # Sidebar
     with st.sidebar:
         st.header("📚 Navigation")
 
+        # Widgets keep their selection across reruns, so topics and stats
+        # for it can be fetched while subjects load instead of after
+        retriever = get_retriever()
+        tracker = get_progress_tracker()
+        prev_subject = st.session_state.get('subject_selector')
+        prev_topic = st.session_state.get('topic_selector')
+
+        subjects_future = _submit(_cached_subjects, retriever)
+        topics_future = stats_future = None
+        if prev_subject:
+            topics_future = _submit(_cached_topics, retriever, prev_subject)
+            if prev_topic:
+                stats_future = _submit(_cached_user_stats, tracker,
+                                       prev_subject, prev_topic)
+
         # Get subjects
         try:
-            subjects = st.session_state.retriever.get_all_subjects()
+            subjects = subjects_future.result()
         except Exception as e:
             st.error(f"Error loading subjects: {e}")
             subjects = []
@@ -141,7 +293,10 @@ def main():
 
         # Topic selection
         try:
-            topics = st.session_state.retriever.get_topics_for_subject(selected_subject)
+            if topics_future is not None and selected_subject == prev_subject:
+                topics = topics_future.result()
+            else:
+                topics = _cached_topics(retriever, selected_subject)
             topic_names = [t['name'] for t in topics]
         except Exception as e:
             st.error(f"Error loading topics: {e}")
@@ -173,17 +328,17 @@ def main():
             st.session_state.action = action
             st.session_state.current_subject = selected_subject
             st.session_state.current_topic = selected_topic
-            st.rerun()
 
         # Progress stats
         st.markdown("---")
         st.subheader("📊 Your Progress")
 
         try:
-            stats = st.session_state.progress_tracker.get_user_stats(
-                selected_subject,
-                selected_topic
-            )
+            if (stats_future is not None and selected_subject == prev_subject
+                    and selected_topic == prev_topic):
+                stats = stats_future.result()
+            else:
+                stats = _cached_user_stats(tracker, selected_subject, selected_topic)
 
             col1, col2 = st.columns(2)
             with col1:
@@ -210,51 +365,60 @@ def main():
 
 
 # Learn Mode
+@st.fragment
 def learn_mode(subject: str, topic: str):
     """Learn mode: Present questions in order of difficulty"""
     st.header(f"📖 Learn: {subject} - {topic}")
 
-    # Load questions if not already loaded
-    if not st.session_state.questions_list:
+    questions = st.session_state.questions_list
+    current_idx = st.session_state.current_question_index
+
+    # Load questions a page at a time, fetching the next page only once
+    # the user moves past the questions already loaded
+    if current_idx >= len(questions) and not st.session_state.questions_exhausted:
         with st.spinner("Loading questions..."):
             try:
-                questions = st.session_state.retriever.get_questions_ordered_by_difficulty(
-                    subject, topic, ascending=True
+                page = get_retriever().get_questions_ordered_by_difficulty(
+                    subject, topic, ascending=True,
+                    skip=len(questions), limit=_LEARN_PAGE_SIZE
                 )
-                st.session_state.questions_list = questions
             except Exception as e:
                 st.error(f"Error loading questions: {e}")
                 return
 
-            if not questions:
-                st.warning("No questions available for this topic.")
-                st.info("Questions will be added as you load PYQ data.")
-                return
+        questions.extend(page)
+        st.session_state.questions_exhausted = len(page) < _LEARN_PAGE_SIZE
 
-    questions = st.session_state.questions_list
-    current_idx = st.session_state.current_question_index
+    if not questions:
+        st.warning("No questions available for this topic.")
+        st.info("Questions will be added as you load PYQ data.")
+        return
+
+    # Total from the stored topic count until the last page is loaded
+    total = len(questions)
+    if not st.session_state.questions_exhausted:
+        topic_info = next((t for t in _cached_topics(get_retriever(), subject)
+                           if t['name'] == topic), {})
+        total = max(total, topic_info.get('question_count', 0))
 
     # Progress bar
     if questions:
-        progress = (current_idx) / len(questions)
-        st.progress(progress, text=f"Question {current_idx + 1} of {len(questions)}")
+        progress = min(current_idx / total, 1.0)
+        st.progress(progress, text=f"Question {current_idx + 1} of {total}")
 
         if current_idx < len(questions):
             question = questions[current_idx]
 
             # Display question
-            st.markdown(f"""
-            <div class="question-card">
-                <h3>Question {current_idx + 1}</h3>
-                <p style="font-size: 1.1rem; margin: 1rem 0;">
-                    {question['question']}
-                </p>
-                <p style="color: #666; font-size: 0.9rem;">
-                    <strong>Year:</strong> {question.get('year', 'N/A')} | 
-                    <strong>Difficulty:</strong> {'⭐' * max(1, question.get('difficulty', 1))}
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
+            with st.container(border=True):
+                st.subheader(f"Question {current_idx + 1}")
+                st.write(question['question'])
+                st.caption(f"**Year:** {question.get('year', 'N/A')} | "
+                           f"**Difficulty:** {_stars(question.get('difficulty', 1))}")
+
+            # Fetch contexts for "Teach Me" while the user reads
+            prefetch_contexts(subject, topic,
+                              questions[current_idx:current_idx + 3])
 
             # Display options
             if question.get('options'):
@@ -269,18 +433,26 @@ def learn_mode(subject: str, topic: str):
                 with col1:
                     if st.button("✓ Submit Answer", type="primary"):
                         is_correct = user_answer == question['answer']
+
+                        # Keep the summary's correct count running; a
+                        # resubmitted question replaces its earlier answer
+                        previous = st.session_state.user_answers.get(current_idx)
+                        st.session_state.correct_count += (
+                            int(is_correct) - int(bool(previous and previous['correct']))
+                        )
                         st.session_state.user_answers[current_idx] = {
                             'user_answer': user_answer,
                             'correct': is_correct
                         }
 
-                        # Track progress
-                        try:
-                            st.session_state.progress_tracker.record_attempt(
-                                subject, topic, question['question'], is_correct
-                            )
-                        except Exception as e:
-                            st.error(f"Error recording attempt: {e}")
+                        # Track progress in the background; the write
+                        # reports its own errors, and stats are refreshed
+                        # once it has committed
+                        attempt = _get_executor().submit(
+                            get_progress_tracker().record_attempt,
+                            subject, topic, question['question'], is_correct
+                        )
+                        attempt.add_done_callback(lambda _: _cached_user_stats.clear())
 
                         if is_correct:
                             st.success("✓ Correct!")
@@ -288,34 +460,32 @@ def learn_mode(subject: str, topic: str):
                             st.error(f"✗ Incorrect. Correct answer: {question['answer']}")
 
                 with col2:
-                    if st.button("💡 Teach Me"):
-                        st.session_state.show_explanation = True
-                        st.rerun()
+                    # Per-question toggle; its state is the widget's own,
+                    # and the explanation renders further down in this run
+                    st.toggle("💡 Teach Me", key=f"explain_{current_idx}")
 
                 with col3:
                     if st.button("⏭️ Next Question"):
                         st.session_state.current_question_index += 1
-                        st.session_state.show_explanation = False
-                        st.rerun()
+                        st.rerun(scope="fragment")
 
-            # Show explanation if requested
-            if st.session_state.show_explanation:
+            # Show explanation if requested; generated only once toggled on
+            if st.session_state.get(f"explain_{current_idx}"):
                 with st.expander("📚 Explanation", expanded=True):
                     with st.spinner("Generating explanation..."):
                         try:
                             # Get context
-                            context = st.session_state.retriever.vector_search(
-                                question['question'], subject=subject, topic=topic, top_k=3
+                            context = get_context(subject, topic, question['question'])
+
+                            st.write_stream(
+                                get_answer_generator().generate_explanation_stream(
+                                    question['question'],
+                                    question.get('answer', 'N/A'),
+                                    subject,
+                                    topic,
+                                    context
+                                )
                             )
-
-                            explanation = st.session_state.answer_gen.generate_explanation(
-                                question['question'],
-                                question.get('answer', 'N/A'),
-                                subject,
-                                topic,
-                                context
-                            )
-                            st.markdown(explanation)
                         except Exception as e:
                             st.error(f"Error generating explanation: {e}")
         else:
@@ -323,7 +493,7 @@ def learn_mode(subject: str, topic: str):
             st.success("🎉 Congratulations! You've completed all questions for this topic.")
 
             # Show summary
-            correct_count = sum(1 for ans in st.session_state.user_answers.values() if ans['correct'])
+            correct_count = st.session_state.correct_count
             total_count = len(st.session_state.user_answers)
             accuracy = (correct_count / total_count * 100) if total_count > 0 else 0
 
@@ -337,17 +507,18 @@ def learn_mode(subject: str, topic: str):
 
             if st.button("🔄 Restart", type="primary"):
                 reset_session()
-                st.rerun()
+                st.rerun(scope="fragment")
 
 
 # Teach Mode
+@st.fragment
 def teach_mode(subject: str, topic: str):
     """Teach mode: AI explains concepts"""
     st.header(f"🧑‍🏫 Teach: {subject} - {topic}")
 
     # Get topic information
     try:
-        topic_info = st.session_state.retriever.graph_search(subject, topic)
+        topic_info = get_retriever().graph_search(subject, topic)
     except Exception as e:
         st.error(f"Error loading topic info: {e}")
         topic_info = {}
@@ -359,7 +530,7 @@ def teach_mode(subject: str, topic: str):
     """)
 
     difficulty = topic_info.get('difficulty', 1)
-    st.markdown(f"**Difficulty Level:** {'⭐' * difficulty}")
+    st.markdown(f"**Difficulty Level:** {_stars(difficulty or 1)}")
 
     st.markdown("---")
 
@@ -374,21 +545,18 @@ def teach_mode(subject: str, topic: str):
             with st.spinner("Generating explanation..."):
                 try:
                     # Retrieve relevant context
-                    context = st.session_state.retriever.hybrid_search(
+                    context = get_retriever().hybrid_search(
                         user_query, subject, topic, top_k=5
                     )
 
-                    # Generate explanation
-                    explanation = st.session_state.answer_gen.teach(
+                    # Generate and display explanation as it streams in
+                    st.markdown("### Explanation")
+                    st.write_stream(get_answer_generator().teach_stream(
                         query=user_query,
                         subject=subject,
                         topic=topic,
                         context=context
-                    )
-
-                    # Display explanation
-                    st.markdown("### Explanation")
-                    st.markdown(explanation)
+                    ))
 
                 except Exception as e:
                     st.error(f"Error generating explanation: {e}")
@@ -397,6 +565,7 @@ def teach_mode(subject: str, topic: str):
 
 
 # Practice Mode
+@st.fragment
 def practice_mode(subject: str, topic: str):
     """Practice mode: Generate AI questions"""
     st.header(f"✍️ Practice: {subject} - {topic}")
@@ -412,30 +581,26 @@ def practice_mode(subject: str, topic: str):
             "Difficulty level",
             options=[1, 2, 3, 4, 5],
             value=2,
-            format_func=lambda x: '⭐' * x
+            format_func=_stars
         )
 
     if st.button("🎲 Generate Questions", type="primary"):
-        with st.spinner("Generating questions..."):
-            try:
-                # Get example questions
-                pyqs = st.session_state.retriever.get_questions_by_topic(
-                    subject, topic, limit=5
-                )
+        practice_key = (subject, topic, num_questions, difficulty)
 
-                # Generate new questions
-                generated_questions = st.session_state.answer_gen.generate_practice_questions(
-                    subject=subject,
-                    topic=topic,
-                    num_questions=num_questions,
-                    difficulty=difficulty,
-                    example_questions=pyqs
-                )
-
-                st.session_state.practice_questions = generated_questions
+        # Repeated presses with unchanged settings keep the current set
+        if (st.session_state.get('last_practice_key') == practice_key
+                and st.session_state.get('practice_questions')):
+            st.info("Questions for these settings are shown below.")
+        else:
+            with st.spinner("Generating questions..."):
+                try:
+                    questions = _cached_practice_questions(*practice_key)
+                    st.session_state.practice_questions = questions
+                    if questions:
+                        st.session_state.last_practice_key = practice_key
 
-            except Exception as e:
-                st.error(f"Error generating questions: {e}")
+                except Exception as e:
+                    st.error(f"Error generating questions: {e}")
 
     # Display generated questions
     if 'practice_questions' in st.session_state and st.session_state.practice_questions:
@@ -462,35 +627,32 @@ def practice_mode(subject: str, topic: str):
 
 
 # Read Mode
+@st.fragment
 def read_mode(subject: str, topic: str):
     """Read mode: Build reading material"""
     st.header(f"📚 Read: {subject} - {topic}")
 
     with st.spinner("Building reading material..."):
         try:
-            # Get relevant chunks
-            chunks = st.session_state.retriever.vector_search(
-                query=f"comprehensive explanation of {topic}",
-                subject=subject,
-                topic=topic,
-                top_k=10
-            )
-
-            if not chunks:
+            # Get relevant chunks; the same chunks give the same prompt, so
+            # repeat visits stream the material from the response cache
+            try:
+                chunks = _cached_reading_chunks(subject, topic, _cached_chunk_count())
+            except LookupError:
                 st.warning("No reading material available for this topic.")
                 st.info("Material will be available after loading textbook data.")
                 return
 
-            # Generate structured reading material
-            reading_material = st.session_state.answer_gen.build_reading_material(
-                subject=subject,
-                topic=topic,
-                chunks=chunks
+            # Generate and display structured reading material as it streams
+            # in; write_stream returns the full text for the download
+            reading_material = st.write_stream(
+                get_answer_generator().build_reading_material_stream(
+                    subject=subject,
+                    topic=topic,
+                    chunks=chunks
+                )
             )
 
-            # Display reading material
-            st.markdown(reading_material)
-
             # Download option
             st.download_button(
                 label="📥 Download as Text",
@@ -504,6 +666,7 @@ def read_mode(subject: str, topic: str):
 
 
 # Flashcard Mode
+@st.fragment
 def flashcard_mode(subject: str, topic: str):
     """Flashcard mode: Spaced repetition"""
     st.header(f"🃏 Flashcards: {subject} - {topic}")
@@ -521,12 +684,12 @@ def flashcard_mode(subject: str, topic: str):
         if st.button("📝 Create New Flashcards"):
             with st.spinner("Generating flashcards..."):
                 try:
-                    flashcards = st.session_state.answer_gen.generate_flashcards(
+                    flashcards = get_answer_generator().generate_flashcards(
                         subject, topic, num_cards=10
                     )
                     st.session_state.sr_manager.add_cards(flashcards)
                     st.success(f"Created {len(flashcards)} new flashcards!")
-                    st.rerun()
+                    st.rerun(scope="fragment")
                 except Exception as e:
                     st.error(f"Error creating flashcards: {e}")
         return
@@ -545,29 +708,23 @@ def flashcard_mode(subject: str, topic: str):
                     text=f"Card {card_idx + 1} of {len(due_cards)}")
 
         # Show question side
-        st.markdown(f"""
-        <div class="question-card">
-            <h3>Question</h3>
-            <p style="font-size: 1.2rem;">{card['front']}</p>
-        </div>
-        """, unsafe_allow_html=True)
+        with st.container(border=True):
+            st.subheader("Question")
+            st.write(card['front'])
 
         # Flip button
         if 'show_answer' not in st.session_state:
             st.session_state.show_answer = False
 
+        # The answer renders right below in this same run
         if st.button("🔄 Flip Card", type="primary", use_container_width=True):
             st.session_state.show_answer = True
-            st.rerun()
 
         # Show answer if flipped
         if st.session_state.show_answer:
-            st.markdown(f"""
-            <div class="question-card" style="background-color: #e8f4f8;">
-                <h3>Answer</h3>
-                <p style="font-size: 1.1rem;">{card['back']}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            with st.container(border=True):
+                st.subheader("Answer")
+                st.info(card['back'])
 
             # Rating buttons
             st.markdown("### How well did you remember?")
@@ -590,7 +747,7 @@ def flashcard_mode(subject: str, topic: str):
         if st.button("🔄 Reset"):
             st.session_state.current_card_idx = 0
             st.session_state.show_answer = False
-            st.rerun()
+            st.rerun(scope="fragment")
 
 
 def rate_card(card, rating):
@@ -599,7 +756,7 @@ def rate_card(card, rating):
         st.session_state.sr_manager.review_card(card['id'], rating)
         st.session_state.current_card_idx += 1
         st.session_state.show_answer = False
-        st.rerun()
+        st.rerun(scope="fragment")
     except Exception as e:
         st.error(f"Error rating card: {e}")
 
@@ -607,14 +764,8 @@ def rate_card(card, rating):
 # Welcome Screen
 def show_welcome_screen():
     """Show welcome screen"""
-    st.markdown("""
-    <div style="text-align: center; padding: 2rem;">
-        <h2>Welcome to your GATE CS 2026 Preparation System! 🎓</h2>
-        <p style="font-size: 1.2rem; color: #666;">
-            Select a subject, topic, and action from the sidebar to get started.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.subheader("Welcome to your GATE CS 2026 Preparation System! 🎓")
+    st.caption("Select a subject, topic, and action from the sidebar to get started.")
 
     # Feature cards
     col1, col2, col3 = st.columns(3)